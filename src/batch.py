@@ -0,0 +1,171 @@
+import numpy as np
+
+import parameters as p
+from option import MULT
+from payoff import pieces, positivePieces, expectedOf, probOf, maxOf, lossOf, metricsOf
+import runctx
+from stratspec import combBlocks, combTable
+import settings as s
+
+
+class StrategyBatch:
+    # Every strike combination of one template, for one symbol and expiry.
+    # Legs are (strategies, legs) arrays, so metrics for the whole batch are NumPy expressions.
+    # 'cls' is a SpecStrat template, its compiled spec gives the per-leg BS, CP and multipliers.
+    def __init__(self, cls, symbol, expr, strike, premium, n=s.nContracts):
+        self.cls = cls
+        self.symbol = symbol
+        self.expr = expr
+        self.nContracts = n
+        spec = cls.spec()
+        self.BS = spec.BS
+        self.CP = spec.CP
+        self.n = n*spec.M
+        self.strike = np.asarray(strike, dtype=float).reshape(-1, spec.nLegs)
+        self.premium = np.asarray(premium, dtype=float).reshape(-1, spec.nLegs)
+
+
+    def __len__(self):
+        return self.strike.shape[0]
+
+
+    def __repr__(self):
+        return 'StrategyBatch: {} x {} on {} {}'.format(len(self), self.cls.name, self.symbol, self.expr)
+
+
+    @classmethod
+    def fromChain(cls, stratcls, opchain, e, n=s.nContracts, combs=None):
+        # Combinations of 'stratcls' on expiry index 'e' of an OptionChain
+        # 'combs' is a (combinations, nStrikes) array of strike indices, all of them if None.
+        # Combinations that need a contract missing from the chain are dropped.
+        strikes, callprem, putprem, callOk, putOk = opchain.aligned(e)
+        spec = stratcls.spec()
+        if combs is None:
+            combs = combTable(len(strikes), spec.nStrikes)
+        combs = combs.reshape(-1, spec.nStrikes)
+        if not (callOk.all() and putOk.all()):
+            avail = spec.slotAvailable(callOk, putOk)
+            combs = combs[np.all(avail[np.arange(spec.nStrikes), combs], axis=-1)]
+
+        idx = spec.legIndex(combs)
+        premium = np.where(spec.CP == p.CALL, callprem[idx], putprem[idx])
+        return cls(stratcls, opchain.symbol, opchain.expiries[e], strikes[idx], premium, n=n)
+
+
+    @classmethod
+    def iterChain(cls, stratcls, opchain, e, n=s.nContracts, chunk=s.gen_chunk, constraints=None, window=None):
+        # Yields batches of at most 'chunk' combinations, skipping the ones the chain can't fill
+        # With 'constraints' (a GenConstraints), only combinations that satisfy them are built
+        # With 'window' (lo, hi), only strikes inside that price range are used
+        strikes, callprem, putprem, callOk, putOk = opchain.aligned(e)
+        keep = slice(0, len(strikes))
+        if window is not None:
+            keep = slice(np.searchsorted(strikes, window[0], side='left'), np.searchsorted(strikes, window[1], side='right'))
+
+        spec = stratcls.spec()
+        nKeep = keep.stop - keep.start
+        if nKeep < spec.nStrikes:
+            return
+        if constraints is None:
+            blocks = combBlocks(nKeep, spec.nStrikes, chunk)
+        else:
+            avail = spec.slotAvailable(callOk[keep], putOk[keep])
+            blocks = constraints.combBlocks(spec, strikes[keep], callprem[keep], putprem[keep], chunk, n=n, available=avail)
+
+        for combs in blocks:
+            if keep.start:
+                combs = combs + keep.start
+            batch = cls.fromChain(stratcls, opchain, e, n=n, combs=combs)
+            if len(batch):
+                yield batch
+
+
+    def select(self, mask):
+        # Sub-batch of the strategies where 'mask' (bool or index array) is set
+        sub = object.__new__(StrategyBatch)
+        sub.cls = self.cls
+        sub.symbol = self.symbol
+        sub.expr = self.expr
+        sub.nContracts = self.nContracts
+        sub.BS = self.BS
+        sub.CP = self.CP
+        sub.n = self.n
+        sub.strike = self.strike[mask]
+        sub.premium = self.premium[mask]
+        return sub
+
+
+    def strategies(self):
+        # Materializes the batch as a list of template instances
+        return [self.cls.fromLegs(self.symbol, self.expr, k, pr, n=self.nContracts)
+                for k, pr in zip(self.strike.tolist(), self.premium.tolist())]
+
+
+    #---------------------------------------------------------------------------
+    ## Measures
+    def weights(self):
+        return self.n*MULT*self.BS
+
+
+    def costs(self):
+        return np.sum(self.n*(MULT*self.BS*self.premium + p.option_commission), axis=-1)
+
+
+    def payoffMatrix(self, prices):
+        # (strategies, prices) exercise values
+        S = np.asarray(prices, dtype=float)[..., np.newaxis]
+        intrinsic = np.maximum(self.CP*(S[np.newaxis, ...] - self.strike[:, np.newaxis, :]), 0)
+        return -self.costs()[:, np.newaxis] + np.sum(self.weights()*intrinsic, axis=-1)
+
+
+    def safeSell(self, stock_price):
+        itm = self.CP*(stock_price - self.strike) > 0
+        return ~np.any((self.BS == p.SELL) & itm, axis=-1)
+
+
+    def freePremium(self):
+        return np.any(self.premium == 0, axis=-1)
+
+
+    #---------------------------------------------------------------------------
+    ## Payoff profile
+    def profile(self):
+        # Kinks (with 0 prepended), values at the kinks and slope above the last kink
+        x = np.concatenate((np.zeros((len(self), 1)), np.sort(self.strike, axis=-1)), axis=-1)
+        intrinsic = np.maximum(self.CP*(x[:, :, np.newaxis] - self.strike[:, np.newaxis, :]), 0)
+        values = -self.costs()[:, np.newaxis] + np.sum(self.weights()*intrinsic, axis=-1)
+        slopeRight = np.sum(self.weights()*(self.CP == p.CALL))*np.ones(len(self))
+        return x, values, slopeRight
+
+
+    def maxProfit(self):
+        x, values, slopeRight = self.profile()
+        return maxOf(values, slopeRight)
+
+
+    def maxLoss(self):
+        x, values, slopeRight = self.profile()
+        return lossOf(values, slopeRight)
+
+
+    #---------------------------------------------------------------------------
+    ## Lognormal expectations
+    def expectedProfit(self, stock_price, wk_vol, wk_drift=0, ctx=None):
+        t = (ctx or runctx.active()).remainingMarketDays(self.expr)/5
+        x, values, slopeRight = self.profile()
+        lo, hi, icpt, slope = pieces(x, values, slopeRight)
+        return expectedOf(lo, icpt, slope, t, stock_price, wk_vol, wk_drift=wk_drift)
+
+
+    def probOfProfit(self, stock_price, wk_vol, wk_drift=0, ctx=None):
+        t = (ctx or runctx.active()).remainingMarketDays(self.expr)/5
+        x, values, slopeRight = self.profile()
+        start, end, keep = positivePieces(*pieces(x, values, slopeRight), values)
+        return probOf(start, end, keep, t, stock_price, wk_vol, wk_drift=wk_drift)
+
+
+    def metrics(self, stock_price, wk_vol, wk_drift=0, ctx=None):
+        # {'exp', 'pop', 'loss', 'cvar', 'var', 'ratio'} arrays, one entry per strategy
+        t = (ctx or runctx.active()).remainingMarketDays(self.expr)/5
+        x, values, slopeRight = self.profile()
+        return metricsOf(*pieces(x, values, slopeRight), values, maxOf(values, slopeRight), t, stock_price, wk_vol, wk_drift=wk_drift)
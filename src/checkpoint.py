@@ -0,0 +1,75 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+from mktcalendar import NYSE_TZ
+import parameters as p
+import settings as s
+
+# Per-symbol scan checkpoints.
+# Each completed symbol is written to its own file (atomically, so a crash never leaves a
+# half-written one), tagged with a key of everything that determines its results. A resumed
+# scan reuses a symbol's file only when the key matches.
+
+# Settings that change which strategies survive a scan
+SCAN_INPUTS = ('min_prob_profit', 'opchain_size', 'nContracts', 'min_profit_ratio', 'min_expected_profit',
+               'int_rtol_screen', 'int_rtol_final', 'int_atol', 'analytic_eval',
+               'moneyness_window', 'max_spread_width', 'min_credit', 'strike_window')
+
+
+def scanKey(ctx, stratlist):
+    # Hash of the scan inputs: the trading session the quotes come from, the templates and
+    # the thresholds in settings
+    inputs = {'session': ctx.now.astimezone(NYSE_TZ).date().isoformat(),
+              'templates': [cls.__name__ for cls in stratlist],
+              'commission': p.option_commission}
+    inputs.update({name: getattr(s, name) for name in SCAN_INPUTS})
+    return hashlib.sha1(repr(sorted(inputs.items())).encode()).hexdigest()
+
+
+def atomicDump(obj, path):
+    # Pickles 'obj' to a temporary file next to 'path', then renames it over 'path'
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class Checkpoints:
+    def __init__(self, key, directory=s.checkpoint_dir):
+        self.key = key
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+
+    def __repr__(self):
+        return 'Checkpoints: {} ({})'.format(self.directory, self.key[:8])
+
+
+    def path(self, symbol):
+        return os.path.join(self.directory, '{}.pkl'.format(symbol))
+
+
+    def save(self, symbol, entries, meta=None):
+        atomicDump({'key': self.key, 'symbol': symbol, 'meta': meta or {}, 'entries': entries}, self.path(symbol))
+
+
+    def load(self, symbol):
+        # Returns the checkpointed entries of 'symbol', None if there is no usable checkpoint
+        try:
+            with open(self.path(symbol), 'rb') as f:
+                ck = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if ck.get('key') != self.key:
+            return None
+        return ck['entries']
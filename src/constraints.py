@@ -0,0 +1,163 @@
+import numpy as np
+from math import comb
+
+import parameters as p
+from option import MULT
+from stratspec import combTable, COMB_TABLE_MAX
+
+
+class GenConstraints:
+    # Constraints applied while strikes are chosen in strategy generation
+    #   noZeroPremium: no leg with a zero premium
+    #   price:         current stock price, no short leg may be ITM at it (same as OpStrat.safeSell)
+    #   moneyness:     (lo, hi), every strike within [lo*price, hi*price]
+    #   maxWidth:      highest strike - lowest strike <= maxWidth
+    #   minCredit:     -cost >= minCredit
+    #   minScore:      prune when (upper bound on max profit)*popBound < minScore.
+    #                  Expected profit <= max profit*probability of profit, so with
+    #                  minScore = s.min_expected_profit nothing that could pass is dropped.
+    def __init__(self, noZeroPremium=True, price=None, moneyness=None, maxWidth=None, minCredit=None, minScore=None, popBound=1):
+        self.noZeroPremium = noZeroPremium
+        self.price = price
+        self.moneyness = moneyness
+        self.maxWidth = maxWidth
+        self.minCredit = minCredit
+        self.minScore = minScore
+        self.popBound = popBound
+
+
+    def __repr__(self):
+        return 'GenConstraints: {}'.format(self.__dict__)
+
+
+    #---------------------------------------------------------------------------
+    ## Per strike slot tables
+    def slotTables(self, spec, strikes, callprem, putprem, n, available=None):
+        # Returns (nStrikes, len(strikes)) arrays: allowed mask, credit and max profit bound
+        # of the legs in each slot when that slot sits at each strike
+        # 'available' is the spec's slotAvailable mask when the chain has missing contracts
+        K = np.asarray(strikes, dtype=float)
+        if available is None:
+            allowed = np.ones((spec.nStrikes, len(K)), dtype=bool)
+        else:
+            allowed = np.array(available, dtype=bool)
+        credit = np.zeros((spec.nStrikes, len(K)))
+        upper = np.zeros((spec.nStrikes, len(K)))
+        for leg in range(spec.nLegs):
+            k = spec.slot[leg]
+            BS, CP, nl = spec.BS[leg], spec.CP[leg], n*spec.M[leg]
+            prem = np.asarray(callprem if CP == p.CALL else putprem, dtype=float)
+            legCredit = -nl*(MULT*BS*prem + p.option_commission)
+            credit[k] += legCredit
+
+            # Largest exercise value of the leg alone; the sum over legs bounds the strategy's
+            if BS == p.SELL:
+                upper[k] += legCredit
+            elif CP == p.CALL:
+                upper[k] += np.inf
+            else:
+                upper[k] += legCredit + nl*MULT*K
+
+            if self.noZeroPremium:
+                allowed[k] &= prem != 0
+            if self.price is not None and BS == p.SELL:
+                allowed[k] &= ~(CP*(self.price - K) > 0)
+
+        if self.moneyness is not None and self.price is not None:
+            inside = (K >= self.moneyness[0]*self.price) & (K <= self.moneyness[1]*self.price)
+            allowed &= inside[np.newaxis, :]
+
+        return allowed, credit, upper
+
+
+    #---------------------------------------------------------------------------
+    ## Enumeration
+    def combBlocks(self, spec, strikes, callprem, putprem, chunk, n=1, available=None):
+        # Yields (<= chunk, nStrikes) strike index arrays of the combinations that satisfy the constraints,
+        # in lexicographic order
+        K = np.asarray(strikes, dtype=float)
+        allowed, credit, upper = self.slotTables(spec, K, callprem, putprem, n, available=available)
+        if comb(len(K), spec.nStrikes) > COMB_TABLE_MAX:
+            yield from self.walkBlocks(K, allowed, credit, upper, chunk)
+            return
+
+        # Small enough for the cached table, filtered as arrays
+        table = combTable(len(K), spec.nStrikes)
+        table = table[self.tableMask(table, K, allowed, credit, upper)]
+        for i in range(0, len(table), chunk):
+            yield table[i:i + chunk]
+
+
+    def tableMask(self, table, K, allowed, credit, upper):
+        # Rows of a (combinations, nStrikes) index table that satisfy the constraints
+        slots = np.arange(table.shape[1])
+        keep = np.all(allowed[slots, table], axis=-1)
+        if self.maxWidth is not None:
+            keep &= K[table[:, -1]] - K[table[:, 0]] <= self.maxWidth
+        if self.minCredit is not None:
+            keep &= np.sum(credit[slots, table], axis=-1) >= self.minCredit
+        if self.minScore is not None:
+            # An unbounded max profit times a zero PoP bound is nan, which isn't pruned
+            with np.errstate(invalid='ignore'):
+                keep &= ~(np.sum(upper[slots, table], axis=-1)*self.popBound < self.minScore)
+        return keep
+
+
+    def walkBlocks(self, K, allowed, credit, upper, chunk):
+        # Depth-first branch and bound over the strike slots, for tables too large to hold
+        m, N = allowed.shape
+
+        # Best credit / bound any later slot can still add when it sits at index >= i
+        def suffixBest(table):
+            best = np.where(allowed, table, -np.inf)
+            best = np.maximum.accumulate(best[:, ::-1], axis=1)[:, ::-1]
+            return np.concatenate((best, np.full((m, 1), -np.inf)), axis=1)
+
+        bestCredit = suffixBest(credit)
+        bestUpper = suffixBest(upper)
+
+        def restBound(best, k, i):
+            # Optimistic total of slots k+1.. when slot k sits at index i, -inf if one can't be filled
+            total = 0.
+            for r in range(k + 1, m):
+                b = best[r, min(i + r - k, N)]
+                if b == -np.inf:
+                    return -np.inf
+                total += b
+            return total
+
+        out = []
+        combo = [0]*m
+
+        def walk(k, start, cred, upp):
+            for i in range(start, N - (m - k) + 1):
+                if self.maxWidth is not None and k > 0 and K[i] - K[combo[0]] > self.maxWidth:
+                    break
+                if not allowed[k, i]:
+                    continue
+
+                c = cred + credit[k, i]
+                u = upp + upper[k, i]
+                rest = restBound(bestCredit, k, i)
+                if rest == -np.inf:
+                    continue
+                if self.minCredit is not None and c + rest < self.minCredit:
+                    continue
+                if self.minScore is not None and (u + restBound(bestUpper, k, i))*self.popBound < self.minScore:
+                    continue
+
+                combo[k] = i
+                if k == m - 1:
+                    out.append(tuple(combo))
+                else:
+                    yield from walk(k + 1, i + 1, c, u)
+
+                if len(out) >= chunk:
+                    yield out[:]
+                    out.clear()
+
+        for block in walk(0, 0, 0., 0.):
+            yield np.array(block, dtype=int).reshape(-1, m)
+
+        if out:
+            yield np.array(out, dtype=int).reshape(-1, m)
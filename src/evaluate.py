@@ -0,0 +1,57 @@
+import numpy as np
+
+from batch import StrategyBatch
+from transport import attach
+import settings as s
+
+# Scan filters, run inside the pool workers
+
+
+#-------------------------------------------------------------------------------
+# Filters
+def popOver(pop):
+    return pop > s.min_prob_profit
+
+def profRatio(rat):
+    # The ratio is nan for unbounded max profit, those strategies skip this filter
+    return np.isnan(rat) | (rat > s.min_profit_ratio)
+
+def expOver(exp):
+    return exp > s.min_expected_profit
+
+
+#-------------------------------------------------------------------------------
+# Evaluation
+def evalBatch(batch, price, wk_vol, wk_drift, ctx=None):
+    # Runs the whole filter chain on a StrategyBatch, stopping at the first failed filter.
+    # Returns (row, pop, exp, metrics) for the survivors only.
+    if s.analytic_eval:
+        # Closed form for the whole batch at once, it is already exact
+        m = batch.metrics(price, wk_vol, wk_drift, ctx=ctx)
+        keep = np.flatnonzero(profRatio(m['ratio']) & popOver(m['pop']) & expOver(m['exp']))
+        return [(i, m['pop'][i], m['exp'][i], {k: v[i] for k, v in m.items()}) for i in keep.tolist()]
+
+    # Cheap screen first (fixed steps unless int_rtol_screen is set), then error-controlled
+    # metrics for the strategies that pass it
+    out = []
+    for i, strat in enumerate(batch.strategies()):
+        m = strat.metrics(price, wk_vol, wk_drift, rtol=s.int_rtol_screen, ctx=ctx)
+        if not profRatio(m['ratio']) or not popOver(m['pop']):
+            continue
+        # early = strat.probOfEarlyExercise(price, wk_vol)
+
+        m = strat.metrics(price, wk_vol, wk_drift, rtol=s.int_rtol_final, ctx=ctx)
+        if expOver(m['exp']):
+            out.append((i, m['pop'], m['exp'], m))
+
+    return out
+
+
+def evalShared(task):
+    # Worker entry point. 'task' is (desc, lo, hi, cls, symbol, expr, nContracts, market, ctx)
+    # where 'desc' points at the shared 'strike' and 'premium' arrays of a whole chunk and
+    # [lo, hi) are the rows of this task. Rows are returned relative to the chunk.
+    desc, lo, hi, cls, symbol, expr, n, market, ctx = task
+    arrays = attach(desc)
+    batch = StrategyBatch(cls, symbol, expr, arrays['strike'][lo:hi], arrays['premium'][lo:hi], n=n)
+    return [(lo + i, pop, exp, m) for i, pop, exp, m in evalBatch(batch, *market, ctx=ctx)]
@@ -1,13 +1,21 @@
 import numpy as np
-import datetime
-import sys
+import math
 import os
 
+from mktcalendar import tradingDaysBetween
+
 #-------------------------------------------------------------------------------
 def normal(x, mu=0, sig=1):
     return np.exp(-(((x-mu)/sig)**2)/2)/(sig*np.sqrt(2*np.pi))
 
 
+#-------------------------------------------------------------------------------
+erf = np.vectorize(math.erf, otypes=[float])
+
+def normalCDF(x, mu=0, sig=1):
+    return (1 + erf((x - mu)/(sig*np.sqrt(2))))/2
+
+
 #-------------------------------------------------------------------------------
 def stockPDF(s, t, s0, var, drift=0):
     # Probability of stock price 's' at time 't' given starting price 's0' and variance 'var'
@@ -17,39 +25,50 @@ def stockPDF(s, t, s0, var, drift=0):
     # return np.exp(-np.log(s*np.exp(-t*(-var**2/2 + drift))/s0)**2/(2*t*var**2))/(np.sqrt(2*t*np.pi)*var*s)
 
 
-#-------------------------------------------------------------------------------
-def mktdays_between(start, end):
-    ## Asumes 'end' is on a market day -- reasonable for this usage...
-    delta = end - start
-    current = start
-    oneDay = datetime.timedelta(days=1)
-    count = datetime.timedelta(days=0)
-    while current + oneDay < end:
-        if (current + oneDay).isoweekday() > 4:
-            fake = 12
-        else:
-            count += oneDay
+def stockLogParams(t, s0, var, drift=0):
+    # Mean and standard deviation of log(s) under stockPDF
+    return np.log(s0) + t*(drift - var**2/2), np.abs(var)*np.sqrt(np.abs(t))
+
 
-        current += oneDay
+def strikeWindow(t, s0, var, nsd, drift=0):
+    # Price range within 'nsd' standard deviations of log(s) under stockPDF
+    mu, sig = stockLogParams(t, s0, var, drift=drift)
+    return np.exp(mu - nsd*sig), np.exp(mu + nsd*sig)
 
-    oneHour = datetime.timedelta(hours=1)
-    while current + oneHour < end:
-        count += oneHour
-        current += oneHour
 
-    oneMinute = datetime.timedelta(minutes=1)
-    while current + oneMinute < end:
-        count += oneMinute
-        current += oneMinute
+def stockCDF(s, t, s0, var, drift=0):
+    # Probability that the stock price at time 't' is below 's'
+    mu, sig = stockLogParams(t, s0, var, drift=drift)
+    with np.errstate(divide='ignore'):
+        return normalCDF(np.log(s), mu, sig)
 
-    ## Return in decimal days
-    return count.total_seconds()/oneDay.total_seconds()
+
+def stockPartialMean(s, t, s0, var, drift=0):
+    # Expected value of the stock price at time 't' counting only prices below 's'
+    # The full mean (s = inf) is s0*exp(drift*t)
+    mu, sig = stockLogParams(t, s0, var, drift=drift)
+    with np.errstate(divide='ignore'):
+        return s0*np.exp(drift*t)*normalCDF(np.log(s), mu + sig**2, sig)
+
+
+def stockPartialSquare(s, t, s0, var, drift=0):
+    # Expected value of the squared stock price at time 't' counting only prices below 's'
+    mu, sig = stockLogParams(t, s0, var, drift=drift)
+    with np.errstate(divide='ignore'):
+        return np.exp(2*mu + 2*sig**2)*normalCDF(np.log(s), mu + 2*sig**2, sig)
+
+
+#-------------------------------------------------------------------------------
+def mktdays_between(start, end):
+    # Decimal market days, see mktcalendar
+    return tradingDaysBetween(start, end)
 
 
 #-------------------------------------------------------------------------------
 def getThreads():
-    """ Returns the number of available threads on a posix/win based system """
-    if sys.platform == 'win32':
-        return (int)(os.environ['NUMBER_OF_PROCESSORS'])
-    else:
-        return (int)(os.popen('grep -c cores /proc/cpuinfo').read())
+    """ Returns the number of CPUs this process is allowed to run on """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # No affinity API (Windows, macOS)
+        return os.cpu_count() or 1
@@ -1,145 +1,145 @@
 # Option Strategy Plots:
 # Gets option quotes from TD Ameritrade and plots profit/loss as a function of underlying price for various strategies
 
-from pathos.pools import ProcessPool
-import pickle
-
 from tdam import TDAM
 import config
+import runctx
+from constraints import GenConstraints
+from evaluate import evalShared
+from transport import SharedArrays
+from workpool import WorkerPool
+from ranking import TopK, ParetoFront, SCORES
+from prefetch import Prefetcher
+from checkpoint import Checkpoints, scanKey, SCAN_INPUTS
+from results import ResultWriter
+from resultsdb import ResultsDB
 import settings as s
-from functions import getThreads
 from instruments import test_instruments, dow30, sp100, sp500, index, everything
 from stratlist import allstrats, test_list
 
 tdam = TDAM(token=config.td_token, rf_token=config.td_rf_token)
 
+# Every strategy in the scan is evaluated against the same "now"
+ctx = runctx.freeze()
+
 #-------------------------------------------------------------------------------
 # Choose domain
 instrument_list = sp500
 stratlist = allstrats
 
 #-------------------------------------------------------------------------------
-# Generate
-allstratcombs = {}
+# Generate, Evaluate and Filter
+# Strategies are generated in chunks of s.gen_chunk and evaluated as they come,
+# so only one chunk per template is ever held in memory.
+# Survivors stream into a bounded top-K and (optionally) the Pareto front.
+top = TopK(s.rank_k, SCORES[s.rank_score])
+front = ParetoFront() if s.pareto_front else None
 failed = []
-for symbol in instrument_list:
-    print(symbol)
-    allstratcombs[symbol] = []
-    tdam.refresh()
-    try:
-        opchain = tdam.options(symbol, type='ALL', strikeCount=s.opchain_size, weeks=4)
-    except:
-        failed.append(symbol)
-        print('OpChain Failed for {}'.format(symbol))
-        continue
-
-    for strat in stratlist:
-        try:
-            allstratcombs[symbol].append(strat.gen(opchain))
-        except:
-            print('StratGen Failed for {}: {}'.format(symbol, strat.name))
-
-
-savename = 'save_allstratcombs.pkl'
-savefile = open(savename, 'wb')
-pickle.dump(allstratcombs, savefile)
-savefile.close()
-
 
-#-------------------------------------------------------------------------------
-# Evaluate and Filter
-def popOver(pair):
-    return pair[1] > s.min_prob_profit
-
-def goodBuy(pair):
-    return pair[1]
+# Columnar results, one partition per symbol under results/<run>/
+runName = ctx.now.strftime('%Y%m%d-%H%M%S')
+writer = ResultWriter(runName, stratlist)
+# and the indexed database for queries across runs
+db = ResultsDB()
+runId = db.startRun(runName, {name: getattr(s, name) for name in SCAN_INPUTS})
 
-def profRatio(pair):
-    return pair[1] > s.min_profit_ratio
-
-def noFreePremiums(pair):
-    return not pair[1]
+# Symbols finished by an earlier run with the same inputs are restored, not rescanned
+checkpoints = Checkpoints(scanKey(ctx, stratlist))
+todo = []
+for symbol in instrument_list:
+    entries = checkpoints.load(symbol) if s.resume else None
+    if entries is None:
+        todo.append(symbol)
+        continue
 
-def expOver(trio):
-    return trio[2] > s.min_expected_profit
+    print('{}: restored {} from checkpoint'.format(symbol, len(entries)))
+    writer.write(symbol, entries)
+    db.add(runId, entries)
+    for entry in entries:
+        top.push(entry)
+        if front is not None:
+            front.push(entry)
 
-bigLongList = []
-pool = ProcessPool(nodes=20)
-for symbol in allstratcombs:
+def fetch(symbol):
+    # Runs in the prefetch thread: everything the evaluation of 'symbol' needs from the API
     tdam.refresh()
+    opchain = tdam.options(symbol, type='ALL', strikeCount=s.opchain_size, weeks=4)
+    price = tdam.lastPrice(symbol)
+    wk_drift = tdam.calcWeeklyDrift(symbol, months=3)
+    wk_vol = tdam.calcWeeklyVolatility(symbol, months=3)
+    # Aligned strikes and premiums per expiry, shared by every template
+    opchain.prepare()
+    return opchain, (price, wk_vol, wk_drift)
+
+# Workers stay alive (and warm) across every symbol
+pool = WorkerPool()
+# Symbols are fetched ahead while the previous ones are evaluated
+for symbol, fetched in Prefetcher(fetch, todo):
+    print(symbol)
+    if isinstance(fetched, Exception):
+        failed.append(symbol)
+        print('Fetch Failed for {}: {}'.format(symbol, fetched))
+        continue
+
     try:
-        price = tdam.lastPrice(symbol)
-        wk_drift = tdam.calcWeeklyDrift(symbol, months=3)
-        wk_vol = tdam.calcWeeklyVolatility(symbol, months=3)
+        opchain, market = fetched
+        price, wk_vol, wk_drift = market
         print('{}: Price = {}, Weekly Volatility = {}, Weekly Drift = {}'.format(symbol, price, wk_vol, wk_drift))
-        def evalGoodBuy(strat, price=price):
-            # strat.update(api)
-            return (strat, strat.safeSell(price))
-
-        def evalPop(strat, price=price, wk_vol=wk_vol, wk_drift=wk_drift):
-            # strat.update(api)
-            pop = strat.probOfProfit(price, wk_vol, wk_drift)
-            # early = strat.probOfEarlyExercise(price, wk_vol)
-            return (strat, pop)
-
-        def evalRatio(strat, price=price, wk_vol=wk_vol, wk_drift=wk_drift):
-            # strat.update(api)
-            rat = strat.ratioMaxToExpected(price, wk_vol, wk_drift)
-            return (strat, rat)
-
-        def evalExp(strat, price=price, wk_vol=wk_vol, wk_drift=wk_drift):
-            # strat.update(api)
-            exp = strat.expectedProfit(price, wk_vol, wk_drift)
-            return exp
-
-        def freePremium(strat):
-            # Returns true if any returns are zero
-            ret = 0
-            for op in strat.oplist:
-                ret += (op.premium == 0)
-
-            return (strat, ret > 0)
-
-
-        for stratlist in allstratcombs[symbol]:
-            # Remove strategies if any option premiums are zero
-            goodStrats = pool.map(freePremium, stratlist)
-            filt = list(filter(noFreePremiums, goodStrats))
-            # Remove strategies that sell ITM options
-            goodStrats = pool.map(evalGoodBuy, [st for st, _ in filt])
-            filt = list(filter(goodBuy, goodStrats))
-            # Evaluate profit ratio and filter above threshold
-            profStrats = pool.map(evalRatio, [st for st, _ in filt])
-            filt = list(filter(profRatio, profStrats))
-            # Evaluate probability of profit and filter above threshold
-            popList = pool.map(evalPop, [st for st, _ in filt])
-            filt = list(filter(popOver, popList))
-            # Calculate expected profit for remaining strats
-            filtExp = pool.map(evalExp, [st for st, _ in filt])
-            flat = list(zip(*filt))
-            flat.append(filtExp)
-            popAndExp = list(zip(*flat))
-            bigLongList += list(filter(expOver, popAndExp))
-            print('  Completed {}'.format(stratlist[0].name))
+        # Here rather than in fetch, the context is pickled for the workers on this thread
+        ctx.prime(opchain.expiries)
+        symbolEntries = []
+        stratFailed = []
+
+        # Zero premiums, ITM short legs and anything that can't reach the expected profit
+        # threshold are never generated
+        cons = GenConstraints(price=price, moneyness=s.moneyness_window, maxWidth=s.max_spread_width,
+                              minCredit=s.min_credit, minScore=s.min_expected_profit)
+
+        for strat in stratlist:
+            try:
+                for batch in strat.igen(opchain, chunk=s.gen_chunk, batches=True, constraints=cons, market=market, ctx=ctx):
+                    # Workers read the chunk's arrays from shared memory and get only row ranges,
+                    # one round trip per chunk and only survivors come back
+                    with SharedArrays({'strike': batch.strike, 'premium': batch.premium}) as shared:
+                        rows = pool.mapRows(evalShared, len(batch), lambda lo, hi:
+                                            (shared.desc, lo, hi, strat, symbol, batch.expr, batch.nContracts, market, ctx))
+
+                    if rows:
+                        strats = batch.select([i for i, _, _, _ in rows]).strategies()
+                        for st, (_, pop, exp, m) in zip(strats, rows):
+                            symbolEntries.append((st, pop, exp, m))
+                            top.push((st, pop, exp, m))
+                            if front is not None:
+                                front.push((st, pop, exp, m))
+                print('  Completed {}'.format(strat.name))
+            except:
+                stratFailed.append(strat.name)
+                print('StratGen Failed for {}: {}'.format(symbol, strat.name))
+
+        writer.write(symbol, symbolEntries)
+        db.add(runId, symbolEntries)
+        # Only a complete symbol is checkpointed, so a resumed scan redoes one with failed templates
+        if stratFailed:
+            print('{}: not checkpointed, failed {}'.format(symbol, ', '.join(stratFailed)))
+        else:
+            checkpoints.save(symbol, symbolEntries, meta={'price': price, 'wk_vol': wk_vol, 'wk_drift': wk_drift,
+                                                          'expiries': opchain.dates})
 
     except:
         print('{} Failed'.format(symbol))
 
 
-#-------------------------------------------------------------------------------
-# Sort
-def scaledProfit(trio):
-    return trio[1]*trio[2]
-
-def maxProfit(trio):
-    return trio[0].maxProfit()
-
-sortedList = list(sorted(bigLongList, key=maxProfit))
-sortedList.reverse()
+pool.close()
+db.close()
 
 
-savename = 'save_sortedList.pkl'
-savefile = open(savename, 'wb')
-pickle.dump(sortedList, savefile)
-savefile.close()
+#-------------------------------------------------------------------------------
+# Rank
+# Rankings are partitions of the run too, their rows in ranked order
+sortedList = top.sorted()
+writer.write('_top', sortedList)
+
+if front is not None:
+    paretoList = front.sorted()
+    writer.write('_pareto', paretoList)
 breakpoint()
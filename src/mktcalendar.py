@@ -0,0 +1,151 @@
+import datetime
+from bisect import bisect_left
+import pytz
+
+# NYSE trading calendar
+# Trading time is measured in market days: every full session counts as one day and
+# a partial session counts as the fraction of that session's hours that have passed.
+
+NYSE_TZ = pytz.timezone('America/New_York')
+OPEN = datetime.time(9, 30)
+CLOSE = datetime.time(16, 0)
+EARLY_CLOSE = datetime.time(13, 0)
+
+YEAR_MIN = 1990
+YEAR_MAX = 2100
+EPOCH = datetime.date(YEAR_MIN, 1, 1).toordinal()  # A Monday
+
+# Unscheduled closures (weather, national days of mourning, ...)
+SPECIAL_CLOSURES = [datetime.date(1994, 4, 27),
+                    datetime.date(2001, 9, 11),
+                    datetime.date(2001, 9, 12),
+                    datetime.date(2001, 9, 13),
+                    datetime.date(2001, 9, 14),
+                    datetime.date(2004, 6, 11),
+                    datetime.date(2007, 1, 2),
+                    datetime.date(2012, 10, 29),
+                    datetime.date(2012, 10, 30),
+                    datetime.date(2018, 12, 5),
+                    datetime.date(2025, 1, 9)]
+
+
+#-------------------------------------------------------------------------------
+## Holiday rules
+def easter(year):
+    # Anonymous Gregorian algorithm
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8)//25
+    g = (b - f + 1)//3
+    h = (19*a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2*e + 2*i - h - k) % 7
+    m = (a + 11*h + 22*l)//451
+    month, day = divmod(h + l - 7*m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def nthWeekday(year, month, weekday, n):
+    # n-th (1-based) 'weekday' (Monday = 0) of a month, n = -1 for the last one
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7*(n - 1))
+    else:
+        last = datetime.date(year + month//12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+        return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def observed(day):
+    # Saturday holidays are observed on Friday, Sunday holidays on Monday
+    if day.weekday() == 5:
+        return day - datetime.timedelta(days=1)
+    elif day.weekday() == 6:
+        return day + datetime.timedelta(days=1)
+    return day
+
+
+def holidays(year):
+    hols = []
+    # New Year's Day is not moved back into the previous year when it falls on a Saturday
+    newYear = datetime.date(year, 1, 1)
+    if newYear.weekday() != 5:
+        hols.append(observed(newYear))
+    if year >= 1998:
+        hols.append(nthWeekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    hols.append(nthWeekday(year, 2, 0, 3))  # Washington's Birthday
+    hols.append(easter(year) - datetime.timedelta(days=2))  # Good Friday
+    hols.append(nthWeekday(year, 5, 0, -1))  # Memorial Day
+    if year >= 2022:
+        hols.append(observed(datetime.date(year, 6, 19)))  # Juneteenth
+    hols.append(observed(datetime.date(year, 7, 4)))  # Independence Day
+    hols.append(nthWeekday(year, 9, 0, 1))  # Labor Day
+    hols.append(nthWeekday(year, 11, 3, 4))  # Thanksgiving
+    hols.append(observed(datetime.date(year, 12, 25)))  # Christmas
+    return hols
+
+
+def earlyCloses(year):
+    days = []
+    jul3 = datetime.date(year, 7, 3)
+    if jul3.weekday() < 4:
+        days.append(jul3)
+    days.append(nthWeekday(year, 11, 3, 4) + datetime.timedelta(days=1))  # Day after Thanksgiving
+    dec24 = datetime.date(year, 12, 24)
+    if dec24.weekday() < 4:
+        days.append(dec24)
+    return days
+
+
+## Lookup tables, built once
+HOLIDAYS = sorted(set([d.toordinal() for y in range(YEAR_MIN, YEAR_MAX + 1) for d in holidays(y)] +
+                      [d.toordinal() for d in SPECIAL_CLOSURES]))
+HOLIDAY_SET = frozenset(HOLIDAYS)
+EARLY_CLOSE_SET = frozenset(d.toordinal() for y in range(YEAR_MIN, YEAR_MAX + 1) for d in earlyCloses(y))
+
+
+#-------------------------------------------------------------------------------
+## Queries
+def isTradingDay(day):
+    o = day.toordinal()
+    return (o - EPOCH) % 7 < 5 and o not in HOLIDAY_SET
+
+
+def session(day):
+    # Returns (open, close) times for 'day', or None if the market is closed
+    if not isTradingDay(day):
+        return None
+    if day.toordinal() in EARLY_CLOSE_SET:
+        return OPEN, EARLY_CLOSE
+    return OPEN, CLOSE
+
+
+def tradingDaysBefore(day):
+    # Number of trading days from the calendar epoch up to (not including) 'day'
+    o = day.toordinal()
+    weeks, rem = divmod(o - EPOCH, 7)
+    return 5*weeks + min(rem, 5) - bisect_left(HOLIDAYS, o)
+
+
+def marketPosition(when):
+    # Fractional count of trading days from the calendar epoch to the instant 'when'
+    if when.tzinfo is None:
+        when = NYSE_TZ.localize(when)
+    else:
+        when = when.astimezone(NYSE_TZ)
+
+    day = when.date()
+    pos = tradingDaysBefore(day)
+    hours = session(day)
+    if hours is not None:
+        start = hours[0].hour*3600 + hours[0].minute*60
+        stop = hours[1].hour*3600 + hours[1].minute*60
+        now = when.hour*3600 + when.minute*60 + when.second + when.microsecond/1e6
+        pos += min(max(now - start, 0), stop - start)/(stop - start)
+
+    return pos
+
+
+def tradingDaysBetween(start, end):
+    # Fractional number of trading days between two datetimes (naive ones are taken as New York time)
+    return marketPosition(end) - marketPosition(start)
@@ -0,0 +1,149 @@
+import numpy as np
+
+from option import Option, parseExpiry
+import parameters as p
+import settings as s
+
+
+class OptionChain:
+    # Columnar option chain for one symbol.
+    # One row per contract, sorted by expiry, then CP (puts first), then strike.
+    # 'exp' indexes into 'dates' (the TD expiry keys) and 'expiries' (parsed datetimes).
+    def __init__(self, symbol, dates, strike, bid, ask, mark, exp, CP):
+        self.symbol = symbol
+        self.dates = list(dates)
+        self.expiries = [parseExpiry(d) for d in self.dates]
+
+        order = np.lexsort((strike, CP, exp))
+        self.strike = np.asarray(strike, dtype=float)[order]
+        self.bid = np.asarray(bid, dtype=float)[order]
+        self.ask = np.asarray(ask, dtype=float)[order]
+        self.mark = np.asarray(mark, dtype=float)[order]
+        self.exp = np.asarray(exp, dtype=int)[order]
+        self.CP = np.asarray(CP, dtype=int)[order]
+
+        # Row range of every (expiry, CP) block
+        self.blocks = {}
+        key = 3*self.exp + self.CP
+        for e in range(len(self.dates)):
+            for cp in (p.PUT, p.CALL):
+                lo = np.searchsorted(key, 3*e + cp, side='left')
+                hi = np.searchsorted(key, 3*e + cp, side='right')
+                self.blocks[(e, cp)] = slice(lo, hi)
+
+        self._aligned = {}
+        self._dict = None
+
+
+    def __repr__(self):
+        return 'OptionChain: {}, {} expiries, {} contracts'.format(self.symbol, len(self.dates), len(self.strike))
+
+
+    def __len__(self):
+        return len(self.strike)
+
+
+    @classmethod
+    def fromTD(cls, symbol, chainJson):
+        # Builds the chain from a TD Ameritrade 'marketdata/chains' response
+        dates = []
+        cols = {'strike': [], 'bid': [], 'ask': [], 'mark': [], 'exp': [], 'CP': []}
+        for cp, key in ((p.CALL, 'callExpDateMap'), (p.PUT, 'putExpDateMap')):
+            expMap = chainJson[key]
+            for d in expMap:
+                if d not in dates:
+                    dates.append(d)
+                e = dates.index(d)
+                for k in expMap[d]:
+                    opDic = expMap[d][k][0]
+                    cols['strike'].append(float(k))
+                    cols['bid'].append(opDic['bid'])
+                    cols['ask'].append(opDic['ask'])
+                    cols['mark'].append(opDic['mark'])
+                    cols['exp'].append(e)
+                    cols['CP'].append(cp)
+
+        return cls(symbol, dates, **cols)
+
+
+    @classmethod
+    def fromDict(cls, opchain):
+        # Builds the chain from the old {'calls': {date: {strike: Option}}, 'puts': ...} form
+        dates = []
+        cols = {'strike': [], 'bid': [], 'ask': [], 'mark': [], 'exp': [], 'CP': []}
+        symbol = None
+        for cp, key in ((p.CALL, 'calls'), (p.PUT, 'puts')):
+            for d in opchain[key]:
+                if d not in dates:
+                    dates.append(d)
+                e = dates.index(d)
+                for k in opchain[key][d]:
+                    op = opchain[key][d][k]
+                    symbol = op.symbol
+                    cols['strike'].append(float(k))
+                    cols['bid'].append(op.bid)
+                    cols['ask'].append(op.ask)
+                    cols['mark'].append(op.premium)
+                    cols['exp'].append(e)
+                    cols['CP'].append(cp)
+
+        return cls(symbol, dates, **cols)
+
+
+    #---------------------------------------------------------------------------
+    ## Access
+    def side(self, e, CP):
+        # Returns the sorted strikes and marks for one expiry index and CP
+        blk = self.blocks[(e, CP)]
+        return self.strike[blk], self.mark[blk]
+
+
+    def aligned(self, e):
+        # Returns (strikes, call marks, put marks, call available, put available) for one expiry index.
+        # 'strikes' is the union of the call and put strikes, marks are nan where a side has no contract.
+        # Built once per expiry and shared by every strategy template.
+        if e not in self._aligned:
+            callstrikes, callmarks = self.side(e, p.CALL)
+            putstrikes, putmarks = self.side(e, p.PUT)
+            strikes = np.union1d(callstrikes, putstrikes)
+            callOk = np.isin(strikes, callstrikes)
+            putOk = np.isin(strikes, putstrikes)
+            callprem = np.full(len(strikes), np.nan)
+            putprem = np.full(len(strikes), np.nan)
+            callprem[callOk] = callmarks
+            putprem[putOk] = putmarks
+            self._aligned[e] = (strikes, callprem, putprem, callOk, putOk)
+        return self._aligned[e]
+
+
+    def prepare(self):
+        # Builds the aligned arrays of every expiry up front
+        for e in range(len(self.dates)):
+            self.aligned(e)
+        return self
+
+
+    def option(self, e, CP, strike, BS=0, n=s.nContracts):
+        # Compatibility accessor: builds a full Option for one contract
+        blk = self.blocks[(e, CP)]
+        i = blk.start + np.searchsorted(self.strike[blk], strike)
+        if i >= blk.stop or self.strike[i] != strike:
+            raise KeyError('No {} at {} for {}'.format((CP == 1)*'call' + (CP == -1)*'put', strike, self.dates[e]))
+        return Option.fromParams(self.symbol, CP, self.mark[i], BS, self.strike[i], self.expiries[e], n=n, ask=self.ask[i], bid=self.bid[i])
+
+
+    def asDict(self):
+        # Compatibility view: {'calls': {date: {strike_str: Option}}, 'puts': ...}
+        # Built once, like the dict it replaces the Options are shared by every lookup
+        if self._dict is None:
+            out = {'calls': {}, 'puts': {}}
+            for (e, cp), blk in self.blocks.items():
+                key = (cp == 1)*'calls' + (cp == -1)*'puts'
+                if blk.stop > blk.start:
+                    out[key][self.dates[e]] = {str(k): self.option(e, cp, k) for k in self.strike[blk]}
+            self._dict = out
+        return self._dict
+
+
+    def __getitem__(self, key):
+        return self.asDict()[key]
@@ -1,13 +1,15 @@
-import plotly.offline as py
-import plotly.graph_objs as go
 import numpy as np
 # from scipy.special import erf
-from itertools import combinations
 
 from option import Option
+from opchain import OptionChain
+from batch import StrategyBatch
+from stratspec import StratSpec
 import parameters as p
-from dopri import dopri
-from functions import normal, stockPDF
+from dopri import dopriQuad, dopriAdapt
+from functions import stockPDF, strikeWindow
+from payoff import PayoffProfile
+import runctx
 import settings as s
 
 # Plotting setup
@@ -20,10 +22,52 @@ MULT = 5
 INT_DENOM = 100
 
 
+def integratePrice(fun, stock_price, rtol=None, atol=None, breaks=(), dim=1):
+    # Integrates 'fun(pr, dummy)' over the stock price span, split at the current price and at
+    # 'breaks' (kinks, jumps) so that every piece is smooth.
+    # Fixed steps by default, error-controlled steps when 'rtol' is given.
+    # With 'dim' > 1, 'fun' returns 'dim' integrands and the result is an array of integrals.
+    pSpan = np.array([INT_MIN, MULT*stock_price])
+    dp = stock_price/INT_DENOM
+    e0 = np.zeros(dim)
+    pts = np.unique(np.concatenate((pSpan, [stock_price], breaks)))
+    pts = pts[(pts >= pSpan[0]) & (pts <= pSpan[1])]
+    # Both ends of a step are nodes. Pieces stop just short of the breaks, so a node never sits
+    # on a jump and takes the integrand's value from the other side of it
+    gap = 1e-9*stock_price
+
+    if rtol is None:
+        # Fixed steps of about 'dp' on every piece, all of them in one vectorized call
+        spans = np.column_stack((pts[:-1] + gap, pts[1:] - gap))
+        total = dopriQuad(fun, spans, dp, e0)[1][-1]
+        return total[0] if dim == 1 else total
+
+    if atol is None:
+        atol = s.int_atol
+
+    # Each piece starts at the end nearest the current price and steps outwards, so the steps
+    # only grow once the density has died off instead of stepping over it from a flat tail.
+    total = np.zeros(dim)
+    for lo, hi in zip(pts[:-1], pts[1:]):
+        if hi <= stock_price:
+            ep = dopriAdapt(fun, np.array([hi - gap, lo + gap]), dp, e0, rtol=rtol, atol=atol, quad=True)
+            total -= ep[1][-1]
+        else:
+            ep = dopriAdapt(fun, np.array([lo + gap, hi - gap]), dp, e0, rtol=rtol, atol=atol, quad=True)
+            total += ep[1][-1]
+
+    return total[0] if dim == 1 else total
+
+
+LEG_FIELDS = ('strike', 'CP', 'BS', 'n', 'premium')
+
+
 class OpStrat:
+    __slots__ = ('oplist', 'symbol', 'expr', '_payoff', '_legs')
+    name = 'Custom'
+
     def __init__(self, oplist=[]):
         self.oplist = oplist
-        self.name = 'Custom'
         self.symbol = 'Empty'
 
 
@@ -41,20 +85,14 @@ class OpStrat:
 
     #---------------------------------------------------------------------------
     ## Measures
+    # cost, exerciseValue, anyInMoney and safeSell evaluate all legs at once and accept
+    # a scalar price or an array of prices.
     def cost(self):
-        c = 0
-        for op in self.oplist:
-            c += op.cost()
-
-        return c
+        return self.payoff().cost
 
 
     def exerciseValue(self, stock_price):
-        ev = 0
-        for op in self.oplist:
-            ev += op.exerciseValue(stock_price)
-
-        return ev
+        return self.payoff().value(stock_price)
 
 
     def exitValue(self, option_price):
@@ -65,55 +103,74 @@ class OpStrat:
         return ev
 
 
-    def anyInMoney(self, stock_price):
-        im = True
-        for op in self.oplist:
-            im = im and op.inTheMoney(stock_price)
+    def inTheMoney(self, stock_price):
+        # (..., number of legs) mask of legs that are ITM
+        L = self.legs()
+        S = np.asarray(stock_price, dtype=float)[..., np.newaxis]
+        return L[:,1]*(S - L[:,0]) > 0
+
 
-        return im
+    def anyInMoney(self, stock_price):
+        return np.all(self.inTheMoney(stock_price), axis=-1)
 
 
-    def remainingTime(self):
-        return self.oplist[0].remainingTime()
+    def remainingTime(self, ctx=None):
+        return self.oplist[0].remainingTime(ctx)
 
 
-    def remainingDays(self):
-        return self.oplist[0].remainingDays()
+    def remainingDays(self, ctx=None):
+        return self.oplist[0].remainingDays(ctx)
 
 
-    def remainingMarketDays(self):
-        return self.oplist[0].remainingMarketDays()
+    def remainingMarketDays(self, ctx=None):
+        return self.oplist[0].remainingMarketDays(ctx)
 
 
     def safeSell(self, stock_price):
         # Returns false if you're selling ITM
         # Use this before executing by passing in the current stock price.
         # If you're selling something ITM, it could be exercised immediately, which is bad for you.
-        safe = True
-        for op in self.oplist:
-            if safe and op.BS == p.SELL:
-                safe = safe and not op.inTheMoney(stock_price)
+        sell = self.legs()[:,2] == p.SELL
+        return ~np.any(sell & self.inTheMoney(stock_price), axis=-1)
 
-        return safe
+
+    def legs(self):
+        # Legs as a (number of legs, 5) array with columns LEG_FIELDS
+        # Built once, update() clears it
+        L = getattr(self, '_legs', None)
+        if L is None:
+            L = np.array([[op.strike, op.CP, op.BS, op.n, op.premium] for op in self.oplist], dtype=float)
+            self._legs = L
+        return L
+
+
+    def payoff(self):
+        # Built once from the legs, update() clears it
+        pf = getattr(self, '_payoff', None)
+        if pf is None:
+            pf = PayoffProfile(*self.legs().T)
+            self._payoff = pf
+        return pf
 
 
     #---------------------------------------------------------------------------
     ## Analysis
     def profitTrace(self):
-        self.oplist.sort(key=lambda x: x.strike)
-        spread = self.oplist[-1].strike - self.oplist[0].strike
-        pMin = self.oplist[0].strike*(1-PLOT_EDGE)
-        pMax = self.oplist[-1].strike*(1+PLOT_EDGE)
+        strikes = self.payoff().kinks
+        pMin = strikes[0]*(1-PLOT_EDGE)
+        pMax = strikes[-1]*(1+PLOT_EDGE)
         prices = np.linspace(pMin, pMax, PLOT_RES)
-        profit = []
-        for p in prices:
-            profit.append(self.exerciseValue(p))
+        profit = self.exerciseValue(prices)
 
+        # plotly is only imported when something is plotted, pool workers never load it
+        import plotly.graph_objs as go
         trace = go.Scatter(x=prices, y=profit, mode='lines', line_width=3, name=self.name)
         return trace
 
 
     def exerciseProfitChart(self, filename):
+        import plotly.offline as py
+        import plotly.graph_objs as go
         trace = self.profitTrace()
         layout = go.Layout(scene=dict(xaxis=dict(title_text='Stock Price ($)'),
                                       yaxis=dict(title_text='Net Outcome ($)')
@@ -123,14 +180,16 @@ class OpStrat:
         py.plot(fig, './profit_{}_{}_{}.html'.format(filename, self.name, self.symbol))
 
 
-    def plotProb(self, price, wk_vol, wk_drift=0, filename='temp'):
-        timeToExpInWeeks = self.remainingMarketDays()/5
+    def plotProb(self, price, wk_vol, wk_drift=0, filename='temp', ctx=None):
+        timeToExpInWeeks = self.remainingMarketDays(ctx)/5
         pTrace = self.profitTrace()
         prob = []
         for p in pTrace.x:
             # prob.append(normal(p, mu=price, sig=wk_vol*price))
             prob.append(stockPDF(p, timeToExpInWeeks, price, wk_vol, drift=wk_drift))
 
+        import plotly.offline as py
+        import plotly.graph_objs as go
         prbTrace = go.Scatter(x=pTrace.x, y=prob, text=pTrace.y, mode='lines', line_width=3, name=self.name)
         layout = go.Layout(scene=dict(xaxis=dict(title_text='Stock Price ($)'),
                                       yaxis=dict(title_text='Probability')
@@ -141,19 +200,18 @@ class OpStrat:
 
 
     #___________________________________________________________________________
-    def expectedProfit(self, stock_price, wk_vol, wk_drift=0):
-        timeToExpInWeeks = self.remainingMarketDays()/5
+    def expectedProfit(self, stock_price, wk_vol, wk_drift=0, rtol=None, atol=None, analytic=False, ctx=None):
+        timeToExpInWeeks = self.remainingMarketDays(ctx)/5
+        if analytic:
+            return self.payoff().expectedProfit(timeToExpInWeeks, stock_price, wk_vol, wk_drift=wk_drift)
+
         def fun(pr, dummy):
             prf = self.exerciseValue(pr)
             # prb = normal(pr, stock_price, wk_vol*stock_price)
             prb = stockPDF(pr, timeToExpInWeeks, stock_price, wk_vol, drift=wk_drift)
             return np.array([prf*prb])
 
-        pSpan = np.array([INT_MIN, MULT*stock_price])
-        dp = stock_price/INT_DENOM
-        e0 = np.array([0])
-        ep = dopri(fun, pSpan, dp, e0)
-        return ep[1][-1][0]
+        return integratePrice(fun, stock_price, rtol=rtol, atol=atol, breaks=self.payoff().kinks)
 
 
     def expectedProfitAPI(self, api):
@@ -161,19 +219,19 @@ class OpStrat:
 
 
     #___________________________________________________________________________
-    def probOfProfit(self, stock_price, wk_vol, wk_drift=0):
-        timeToExpInWeeks = self.remainingMarketDays()/5
+    def probOfProfit(self, stock_price, wk_vol, wk_drift=0, rtol=None, atol=None, analytic=False, ctx=None):
+        timeToExpInWeeks = self.remainingMarketDays(ctx)/5
+        if analytic:
+            return self.payoff().probOfProfit(timeToExpInWeeks, stock_price, wk_vol, wk_drift=wk_drift)
+
         def fun(pr, dummy):
             good = (self.exerciseValue(pr) >= 0)
             # prb = normal(pr, stock_price, wk_vol*stock_price)
             prb = stockPDF(pr, timeToExpInWeeks, stock_price, wk_vol, drift=wk_drift)
             return np.array([good*prb])
 
-        pSpan = np.array([INT_MIN, MULT*stock_price])
-        dp = stock_price/INT_DENOM
-        e0 = np.array([0])
-        ep = dopri(fun, pSpan, dp, e0)
-        return ep[1][-1][0]
+        pf = self.payoff()
+        return integratePrice(fun, stock_price, rtol=rtol, atol=atol, breaks=np.append(pf.kinks, pf.breakevens()))
 
 
     def probOfProfitAPI(self, api):
@@ -181,95 +239,70 @@ class OpStrat:
 
 
     #___________________________________________________________________________
-    def probOfEarlyExercise(self, stock_price, wk_vol, wk_drift=0):
-        timeToExpInWeeks = self.remainingMarketDays()/5
+    def metrics(self, stock_price, wk_vol, wk_drift=0, rtol=None, atol=None, analytic=False, ctx=None):
+        # Returns {'exp', 'pop', 'loss', 'cvar', 'var', 'ratio'} (see payoff.METRICS)
+        # from a single integration of a vector integrand
+        timeToExpInWeeks = self.remainingMarketDays(ctx)/5
+        pf = self.payoff()
+        if analytic:
+            return pf.metrics(timeToExpInWeeks, stock_price, wk_vol, wk_drift=wk_drift)
+
+        def fun(pr, dummy):
+            prf = self.exerciseValue(pr)
+            prb = stockPDF(pr, timeToExpInWeeks, stock_price, wk_vol, drift=wk_drift)
+            bad = prf < 0
+            return np.array([prf*prb, ~bad*prb, bad*prb, -prf*bad*prb, prf**2*prb])
+
+        exp, pop, lossProb, loss, sq = integratePrice(fun, stock_price, rtol=rtol, atol=atol,
+                                                      breaks=np.append(pf.kinks, pf.breakevens()), dim=5)
+        cvar = loss/lossProb if lossProb > 0 else 0
+        maxP = pf.maxProfit()
+        ratio = np.nan if np.isinf(maxP) else exp/maxP
+        return {'exp': exp, 'pop': pop, 'loss': loss, 'cvar': cvar, 'var': sq - exp**2, 'ratio': ratio}
+
+
+    #___________________________________________________________________________
+    def probOfEarlyExercise(self, stock_price, wk_vol, wk_drift=0, ctx=None):
+        timeToExpInWeeks = self.remainingMarketDays(ctx)/5
         def exprobAtTime(time, dummy):
+            # 'time' is the full array of time nodes, so the price integral is done for all of them at once
             def probExNow(pr, dummy):
                 aim = self.anyInMoney(pr)
-                prb = stockPDF(pr, time, stock_price, wk_vol, drift=wk_drift)
-                return np.array([aim*prb])
+                prb = stockPDF(pr[np.newaxis, :], time[:, np.newaxis], stock_price, wk_vol, drift=wk_drift)
+                return aim*prb
 
             pSpan = np.array([INT_MIN, MULT*stock_price])
             dp = stock_price/INT_DENOM
-            e0 = np.array([0])
-            ep = dopri(probExNow, pSpan, dp, e0)
-            return ep[1][-1][0]
+            e0 = np.zeros(len(time))
+            ep = dopriQuad(probExNow, pSpan, dp, e0)
+            return ep[1][-1]
 
         tSpan = np.array([0.001, timeToExpInWeeks])
         dt = timeToExpInWeeks/INT_DENOM
         pb0 = np.array([0])
-        pb = dopri(exprobAtTime, tSpan, dt, pb0)
+        pb = dopriQuad(exprobAtTime, tSpan, dt, pb0)
         return pb[1][-1][0]
 
 
     def maxProfit(self):
-        return max(self.profitTrace()['y'])
+        return self.payoff().maxProfit()
 
 
-    def ratioMaxToExpected(self, stock_price, wk_vol, wk_drift=0):
-        exp = self.expectedProfit(stock_price, wk_vol, wk_drift=wk_drift)
-        maxP = self.maxProfit()
-        return exp/maxP
+    def maxLoss(self):
+        return self.payoff().maxLoss()
 
 
-    #---------------------------------------------------------------------------
-    ## Generate
-    @classmethod
-    def gen(cls, opchain, n=s.nContracts):
-        # Returns list of all possible "stratnames" on the options "opchain"
-        # opchain = {'calls': {'date1': {'strike1': Option(), 'strike2': Option()}, 'date2': {...}}, 'puts': {'date': {'strike': Option()}}}
-        # First check overlap in put and call strikes
-        calldate0 = next(iter(opchain['calls']))
-        callstrike0 = next(iter(opchain['calls'][calldate0]))
-        symb = opchain['calls'][calldate0][callstrike0].symbol
-        struct = cls.structure
-
-        stratdefs = []
-        for date in opchain['calls']:
-            callstrikes = []
-            for cs in opchain['calls'][date]:
-                callstrikes.append(cs)
-
-            putstrikes = []
-            for ps in opchain['puts'][date]:
-                putstrikes.append(ps)
-
-            if not callstrikes == putstrikes:
-                print('Mixed call/put chains for date {}'.format(date))
-                continue
-
-            combs = list(combinations(callstrikes, struct['n']))
-
-            # Write definitions dicts into stratdefs
-            for c in combs:
-                opstruct = {}
-                opstruct['expr'] = date
-                k = 0
-                for I in struct:
-                    if I == 'n':
-                        continue
-
-                    opstruct[I] = []
-                    for j, J in enumerate(struct[I]):
-                        opstruct[I].append({})
-                        opstruct[I][j]['strike'] = float(c[k])
-                        if struct[I][j]['CP'] == 1:
-                            # Call
-                            opstruct[I][j]['premium'] = float(opchain['calls'][date][c[k]].premium)
-                        else:
-                            # Put
-                            opstruct[I][j]['premium'] = float(opchain['puts'][date][c[k]].premium)
-
-                        k += 1
-
-                stratdefs.append(opstruct)
-
-        # Generate strategy from dicts
-        strats = []
-        for st in stratdefs:
-            strats.append(cls(symb, st, n=n))
+    def breakevens(self):
+        return self.payoff().breakevens()
 
-        return strats
+
+    def ratioMaxToExpected(self, stock_price, wk_vol, wk_drift=0, rtol=None, atol=None, analytic=False, ctx=None):
+        # nan when the upside is unbounded, there is no max to compare against
+        maxP = self.maxProfit()
+        if np.isinf(maxP):
+            return np.nan
+        exp = self.expectedProfit(stock_price, wk_vol, wk_drift=wk_drift, rtol=rtol, atol=atol, analytic=analytic, ctx=ctx)
+        return exp/maxP
 
 
     #---------------------------------------------------------------------------
@@ -278,6 +311,9 @@ class OpStrat:
         for op in self.oplist:
             op.update(api)
 
+        self._payoff = None
+        self._legs = None
+
 
     def execute(self, api):
         for op in self.oplist:
@@ -286,7 +322,89 @@ class OpStrat:
 
 
 ################################################################################
-class IronCondor(OpStrat):
+class SpecStrat(OpStrat):
+    # Template strategy defined entirely by the class 'structure' (see stratspec)
+    # Subclasses only set 'name' and 'structure'.
+    __slots__ = ()
+    structure = {'n': 0}
+    window = s.strike_window  # Standard deviations around the expected price that strikes are taken from
+
+    def __init__(self, symbol, struct, n=s.nContracts):
+        # struct = {'expr': date, 'A': [{'strike': 100, 'premium': 1.2}, ...], 'B': ...}
+        spec = self.spec()
+        self.symbol = symbol
+        self.oplist = []
+        for k, j, BS, CP, M in zip(spec.slot.tolist(), spec.pos.tolist(), spec.BS.tolist(), spec.CP.tolist(), spec.M.tolist()):
+            self.oplist.append(Option(symbol, {'BS': BS, 'CP': CP}, struct[spec.keys[k]][j], struct['expr'], n=n*M))
+        self.expr = self.oplist[0].expr
+
+
+    @classmethod
+    def spec(cls):
+        # Compiled once per class
+        sp = cls.__dict__.get('_spec')
+        if sp is None:
+            sp = StratSpec(cls.structure)
+            cls._spec = sp
+        return sp
+
+
+    @classmethod
+    def fromLegs(cls, symbol, expr, strike, premium, n=s.nContracts):
+        # Builds an instance from per-leg strikes and premiums, in spec leg order
+        spec = cls.spec()
+        strat = cls.__new__(cls)
+        strat.symbol = symbol
+        strat.oplist = [Option.fromParams(symbol, CP, pr, BS, k, expr, n=n*M)
+                        for k, pr, BS, CP, M in zip(strike, premium, spec.BS.tolist(), spec.CP.tolist(), spec.M.tolist())]
+        strat.expr = strat.oplist[0].expr
+        return strat
+
+
+    #---------------------------------------------------------------------------
+    ## Generate
+    @classmethod
+    def igen(cls, opchain, n=s.nContracts, chunk=s.gen_chunk, batches=False, constraints=None, market=None, ctx=None):
+        # Yields lists of at most 'chunk' strategies on the options "opchain", one expiry at a time
+        # With 'batches', yields the StrategyBatch chunks instead of instances
+        # 'constraints' (a GenConstraints) are applied while the strikes are chosen
+        # With 'market' = (stock_price, wk_vol, wk_drift), only strikes within cls.window standard
+        # deviations of the expected price at each expiry are used
+        if isinstance(opchain, dict):
+            opchain = OptionChain.fromDict(opchain)
+
+        for e in range(len(opchain.dates)):
+            window = None
+            if market is not None and cls.window is not None:
+                stock_price, wk_vol, wk_drift = market
+                t = (ctx or runctx.active()).remainingMarketDays(opchain.expiries[e])/5
+                window = strikeWindow(t, stock_price, wk_vol, cls.window, drift=wk_drift)
+
+            for batch in StrategyBatch.iterChain(cls, opchain, e, n=n, chunk=chunk, constraints=constraints, window=window):
+                if batches:
+                    yield batch
+                else:
+                    yield batch.strategies()
+
+
+    @classmethod
+    def gen(cls, opchain, n=s.nContracts, constraints=None, market=None, ctx=None):
+        # Returns list of all possible "stratnames" on the options "opchain"
+        # opchain is an OptionChain (the old nested dict form is converted)
+        strats = []
+        for chunk in cls.igen(opchain, n=n, constraints=constraints, market=market, ctx=ctx):
+            strats += chunk
+
+        return strats
+
+
+def defineStrat(name, structure):
+    # New template class from data alone, e.g. defineStrat('Jade Lizard', {...})
+    return type(name.replace(' ', ''), (SpecStrat,), {'__slots__': (), 'name': name, 'structure': structure})
+
+
+################################################################################
+class IronCondor(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/iron-condor/
     # def __init__(self, symbol, A_st, A_pr, B_st, B_pr, C_st, C_pr, D_st, D_pr, expr, n=s.nContracts):
     #     self.name = 'Iron Condor'
@@ -297,6 +415,7 @@ class IronCondor(OpStrat):
     #     self.oplist.append(Option(symbol, p.CALL, C_pr, p.SELL, C_st, expr=expr, n=n))
     #     self.oplist.append(Option(symbol, p.CALL, D_pr, p.BUY, D_st, expr=expr, n=n))
 
+    __slots__ = ()
     name = 'IronCondor'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
@@ -305,19 +424,9 @@ class IronCondor(OpStrat):
                  'n': 4
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.oplist.append(Option(symbol, optype['D'][0], struct['D'][0], struct['expr'], n=n*optype['D'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class IronButterfly(OpStrat):
+class IronButterfly(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/iron-butterfly/
     # def __init__(self, symbol, A_st, A_pr, B_st, B_ppr, B_cpr, C_st, C_pr, expr, n=s.nContracts):
     #     self.name = 'Iron Butterfly'
@@ -328,27 +437,18 @@ class IronButterfly(OpStrat):
     #     self.oplist.append(Option(symbol, p.CALL, B_cpr, p.SELL, B_st, expr=expr, n=n))
     #     self.oplist.append(Option(symbol, p.CALL, C_pr, p.BUY, C_st, expr=expr, n=n))
 
+    __slots__ = ()
     name = 'Iron Butterfly'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1},
                        {'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
                  'C': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
-                 'n': 4,
+                 'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][1], struct['B'][1], struct['expr'], n=n*optype['B'][1]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongStraddle(OpStrat):
+class LongStraddle(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-straddle/
     # def __init__(self, symbol, A_st, A_ppr, A_cpr, expr, n=s.nContracts):
     #     self.name = 'Long Straddle'
@@ -357,40 +457,26 @@ class LongStraddle(OpStrat):
     #     self.oplist.append(Option(symbol, p.CALL, A_cpr, p.BUY, A_st, expr=expr, n=n))
     #     self.oplist.append(Option(symbol, p.PUT, A_ppr, p.BUY, A_st, expr=expr, n=n))
 
+    __slots__ = ()
     name = 'Long Straddle'
     structure = {'A': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1},
                        {'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
-                 'n': 2,
+                 'n': 1,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['A'][1], struct['A'][1], struct['expr'], n=n*optype['A'][1]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ShortStraddle(OpStrat):
+class ShortStraddle(SpecStrat):
+    __slots__ = ()
     name = 'Short Straddle'
     structure = {'A': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1},
                        {'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
-                 'n': 2,
+                 'n': 1,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['A'][1], struct['A'][1], struct['expr'], n=n*optype['A'][1]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongStrangle(OpStrat):
+class LongStrangle(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-strangle/
     # def __init__(self, symbol, A_st, A_pr, B_st, B_pr, expr, n=s.nContracts):
     #     self.name = 'Long Strangle'
@@ -399,40 +485,26 @@ class LongStrangle(OpStrat):
     #     self.oplist.append(Option(symbol, p.PUT, A_pr, p.BUY, A_st, expr=expr, n=n))
     #     self.oplist.append(Option(symbol, p.CALL, B_pr, p.BUY, B_st, expr=expr, n=n))
 
+    __slots__ = ()
     name = 'Long Strangle'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
                  'n': 2,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ShortStrangle(OpStrat):
+class ShortStrangle(SpecStrat):
+    __slots__ = ()
     name = 'Short Strangle'
     structure = {'A': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
                  'n': 2,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class SkStPutButterfly(OpStrat):
+class SkStPutButterfly(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/broken-wing-butterfly-put/
     # def __init__(self, symbol, A_st, A_pr, C_st, C_pr, D_st, D_pr, expr, n=s.nContracts):
     #     self.name = 'Broken Wing Put Butterfly'
@@ -442,6 +514,7 @@ class SkStPutButterfly(OpStrat):
     #     self.oplist.append(Option(symbol, p.PUT, C_pr, p.SELL, C_st, expr=expr, n=2*n))
     #     self.oplist.append(Option(symbol, p.PUT, D_pr, p.BUY, D_st, expr=expr, n=n))
 
+    __slots__ = ()
     name = 'Broken Wing Put Butterfly'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 2}],
@@ -449,199 +522,117 @@ class SkStPutButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class SkStCallButterfly(OpStrat):
+class SkStCallButterfly(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/broken-wing-butterfly-call/
+    __slots__ = ()
     name = 'Broken Wing Call Butterfly'
     structure = {'A': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.CALL, 'M': 2}],
                  'C': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
                  'n': 3,
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongCall(OpStrat):
+class LongCall(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-call/
+    __slots__ = ()
     name = 'Long Call'
     structure = {'A': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
                  'n': 1
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongPut(OpStrat):
+class LongPut(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-put/
+    __slots__ = ()
     name = 'Long Put'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'n': 1
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ShortCall(OpStrat):
+class ShortCall(SpecStrat):
+    __slots__ = ()
     name = 'Short Call'
     structure = {'A': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
                  'n': 1
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ShortPut(OpStrat):
+class ShortPut(SpecStrat):
+    __slots__ = ()
     name = 'Short Put'
     structure = {'A': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
                  'n': 1
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongCallSpread(OpStrat):
+class LongCallSpread(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-call-spread/
+    __slots__ = ()
     name = 'Long Call Spread'
     structure = {'A': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
                  'n': 2
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongPutSpread(OpStrat):
+class LongPutSpread(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-put-spread/
+    __slots__ = ()
     name = 'Long Put Spread'
     structure = {'A': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'n': 2
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ShortCallSpread(OpStrat):
+class ShortCallSpread(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/short-call-spread/
+    __slots__ = ()
     name = 'Short Call Spread'
     structure = {'A': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
                  'n': 2
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ShortPutSpread(OpStrat):
+class ShortPutSpread(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/short-put-spread/
+    __slots__ = ()
     name = 'Short Put Spread'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
                  'n': 2
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class BackCallSpread(OpStrat):
+class BackCallSpread(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/call-backspread/
+    __slots__ = ()
     name = 'Back Call Spread'
     structure = {'A': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.CALL, 'M': 2}],
                  'n': 2
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class BackPutSpread(OpStrat):
+class BackPutSpread(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/put-backspread/
+    __slots__ = ()
     name = 'Back Put Spread'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 2}],
                  'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
                  'n': 2
                  }
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongCallButterflySpread(OpStrat):
+class LongCallButterflySpread(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-call-butterfly-spread/
     # Note: For my implementation, this is identical to Skip-Strike Call Butterfly
+    __slots__ = ()
     name = 'Long Call Butterfly Spread'
     structure = {'A': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.CALL, 'M': 2}],
@@ -649,20 +640,12 @@ class LongCallButterflySpread(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongPutButterflySpread(OpStrat):
+class LongPutButterflySpread(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-put-butterfly-spread/
     # Note: For my implementation, this is identical to Skip-Strike Put Butterfly
+    __slots__ = ()
     name = 'Long Put Butterfly Spread'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 2}],
@@ -670,19 +653,11 @@ class LongPutButterflySpread(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class InverseCallButterfly(OpStrat):
+class InverseCallButterfly(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/inverse-broken-wing-butterfly-call/
+    __slots__ = ()
     name = 'Inverse Call Butterfly'
     structure = {'A': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.CALL, 'M': 2}],
@@ -690,19 +665,11 @@ class InverseCallButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class InversePutButterfly(OpStrat):
+class InversePutButterfly(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/inverse-broken-wing-butterfly-put/
+    __slots__ = ()
     name = 'Inverse Put Butterfly'
     structure = {'A': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.PUT, 'M': 2}],
@@ -710,19 +677,11 @@ class InversePutButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ChristmasTreeCallButterfly(OpStrat):
+class ChristmasTreeCallButterfly(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/christmas-tree-butterfly-call/
+    __slots__ = ()
     name = 'Christmas Tree Call Butterfly'
     structure = {'A': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.CALL, 'M': 3}],
@@ -730,18 +689,10 @@ class ChristmasTreeCallButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class FlipChristmasTreeCallButterfly(OpStrat):
+class FlipChristmasTreeCallButterfly(SpecStrat):
+    __slots__ = ()
     name = 'Flipped Christmas Tree Call Butterfly'
     structure = {'A': [{'BS': p.BUY, 'CP': p.CALL, 'M': 2}],
                  'B': [{'BS': p.SELL, 'CP': p.CALL, 'M': 3}],
@@ -749,18 +700,10 @@ class FlipChristmasTreeCallButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class InvChristmasTreeCallButterfly(OpStrat):
+class InvChristmasTreeCallButterfly(SpecStrat):
+    __slots__ = ()
     name = 'Inverse Christmas Tree Call Butterfly'
     structure = {'A': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.CALL, 'M': 3}],
@@ -768,18 +711,10 @@ class InvChristmasTreeCallButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class InvFlipChristmasTreeCallButterfly(OpStrat):
+class InvFlipChristmasTreeCallButterfly(SpecStrat):
+    __slots__ = ()
     name = 'Inverse Flipped Christmas Tree Call Butterfly'
     structure = {'A': [{'BS': p.SELL, 'CP': p.CALL, 'M': 2}],
                  'B': [{'BS': p.BUY, 'CP': p.CALL, 'M': 3}],
@@ -787,19 +722,11 @@ class InvFlipChristmasTreeCallButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ChristmasTreePutButterfly(OpStrat):
+class ChristmasTreePutButterfly(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/christmas-tree-butterfly-put/
+    __slots__ = ()
     name = 'Christmas Tree Put Butterfly'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 2}],
                  'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 3}],
@@ -807,18 +734,10 @@ class ChristmasTreePutButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class FlipChristmasTreePutButterfly(OpStrat):
+class FlipChristmasTreePutButterfly(SpecStrat):
+    __slots__ = ()
     name = 'Flipped Christmas Tree Put Butterfly'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 3}],
@@ -826,18 +745,10 @@ class FlipChristmasTreePutButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class InvChristmasTreePutButterfly(OpStrat):
+class InvChristmasTreePutButterfly(SpecStrat):
+    __slots__ = ()
     name = 'Inverse Christmas Tree Put Butterfly'
     structure = {'A': [{'BS': p.SELL, 'CP': p.PUT, 'M': 2}],
                  'B': [{'BS': p.BUY, 'CP': p.PUT, 'M': 3}],
@@ -845,18 +756,10 @@ class InvChristmasTreePutButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class InvFlipChristmasTreePutButterfly(OpStrat):
+class InvFlipChristmasTreePutButterfly(SpecStrat):
+    __slots__ = ()
     name = 'Inverse Flipped Christmas Tree Put Butterfly'
     structure = {'A': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.PUT, 'M': 3}],
@@ -864,19 +767,11 @@ class InvFlipChristmasTreePutButterfly(OpStrat):
                  'n': 3,
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongCallCondor(OpStrat):
+class LongCallCondor(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-call-condor-spread/
+    __slots__ = ()
     name = 'Long Call Condor'
     structure = {'A': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
@@ -885,19 +780,10 @@ class LongCallCondor(OpStrat):
                  'n': 4
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.oplist.append(Option(symbol, optype['D'][0], struct['D'][0], struct['expr'], n=n*optype['D'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ShortCallCondor(OpStrat):
+class ShortCallCondor(SpecStrat):
+    __slots__ = ()
     name = 'Short Call Condor'
     structure = {'A': [{'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
@@ -906,20 +792,11 @@ class ShortCallCondor(OpStrat):
                  'n': 4
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.oplist.append(Option(symbol, optype['D'][0], struct['D'][0], struct['expr'], n=n*optype['D'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class LongPutCondor(OpStrat):
+class LongPutCondor(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/long-put-condor-spread/
+    __slots__ = ()
     name = 'Long Put Condor'
     structure = {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
@@ -928,19 +805,10 @@ class LongPutCondor(OpStrat):
                  'n': 4
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.oplist.append(Option(symbol, optype['D'][0], struct['D'][0], struct['expr'], n=n*optype['D'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class ShortPutCondor(OpStrat):
+class ShortPutCondor(SpecStrat):
+    __slots__ = ()
     name = 'Short Put Condor'
     structure = {'A': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}],
                  'B': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
@@ -949,30 +817,13 @@ class ShortPutCondor(OpStrat):
                  'n': 4
                  }
 
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.oplist.append(Option(symbol, optype['C'][0], struct['C'][0], struct['expr'], n=n*optype['C'][0]['M']))
-        self.oplist.append(Option(symbol, optype['D'][0], struct['D'][0], struct['expr'], n=n*optype['D'][0]['M']))
-        self.expr = self.oplist[0].expr
-
 
 #_______________________________________________________________________________
-class Template(OpStrat):
+class Template(SpecStrat):
     # https://www.optionsplaybook.com/option-strategies/TEMPLATE/
+    __slots__ = ()
     name = 'Template Name'
     structure = {'A': [{'BS': 0, 'CP': 0, 'M': 0}],
                  'B': [{'BS': 0, 'CP': 0, 'M': 0}],
                  'n': 2
                 }
-
-    def __init__(self, symbol, struct, n=s.nContracts):
-        self.symbol = symbol
-        self.oplist = []
-        optype = self.structure
-        self.oplist.append(Option(symbol, optype['A'][0], struct['A'][0], struct['expr'], n=n*optype['A'][0]['M']))
-        self.oplist.append(Option(symbol, optype['B'][0], struct['B'][0], struct['expr'], n=n*optype['B'][0]['M']))
-        self.expr = self.oplist[0].expr
@@ -1,23 +1,35 @@
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
+import sys
+import numpy as np
 import pytz
-from tzlocal import get_localzone
 
 import parameters as p
-from functions import mktdays_between
+import runctx
 import settings as s
 
 MULT = 100
+EXPR_TZ = pytz.timezone('America/New_York')
+
+@lru_cache(maxsize=None)
+def parseExpiry(expr):
+    # TD expiry keys look like '2020-03-20:4', options stop trading after the close on that date
+    # Cached so every option on the same expiry shares one datetime
+    return EXPR_TZ.localize(datetime.strptime(expr[0:10], '%Y-%m-%d').replace(hour=17, minute=30))
+
 
 class Option:
+    __slots__ = ('symbol', 'CP', 'premium', 'BS', 'strike', 'expr', 'n', 'ask', 'bid')
+
     ## Init
     def __init__(self, symbol, optype, prices, expr, n=s.nContracts, ask=0, bid=0):
-        self.symbol = symbol
+        self.symbol = sys.intern(symbol)
         self.CP = optype['CP']
         self.premium = prices['premium']
         self.BS = optype['BS']
         self.strike = prices['strike']
         try:
-            self.expr = datetime.strptime(expr[0:10], '%Y-%m-%d').replace(hour=17, minute=30, tzinfo=pytz.timezone(zone='America/New_York'))
+            self.expr = parseExpiry(expr)
         except:
             self.expr = expr
         self.n = n
@@ -43,12 +55,8 @@ class Option:
     #---------------------------------------------------------------------------
     ## Measures
     def inTheMoney(self, stock_price):
-        if stock_price > self.strike:
-            return self.CP == 1  # Evals true when option is a call and stock is above strike
-        elif stock_price == self.strike:
-            return False
-        else:
-            return self.CP == -1  # Evals true when option is a put and stock is below strike
+        # Calls are ITM above the strike, puts below it. Works on scalars or arrays of prices.
+        return self.CP*(stock_price - self.strike) > 0
 
 
     def cost(self, option_price=None):
@@ -58,24 +66,21 @@ class Option:
 
 
     def exerciseValue(self, stock_price):
-        return -self.cost() + self.inTheMoney(stock_price)*self.n*MULT*self.CP*self.BS*(stock_price - self.strike)
+        return -self.cost() + self.n*MULT*self.BS*np.maximum(self.CP*(stock_price - self.strike), 0)
 
 
     def exitValue(self, option_price):
         return -self.BS*MULT*self.n*(self.premium - option_price) - 2*self.n*p.option_commission
 
 
-    def remainingTime(self):
-        now = datetime.now().replace(tzinfo=get_localzone())
-        return self.expr - now
+    def remainingTime(self, ctx=None):
+        return (ctx or runctx.active()).remainingTime(self.expr)
 
-    def remainingDays(self):
-        dt = self.remainingTime()
-        return dt.total_seconds()/timedelta(days=1).total_seconds()
+    def remainingDays(self, ctx=None):
+        return (ctx or runctx.active()).remainingDays(self.expr)
 
-    def remainingMarketDays(self):
-        now = datetime.now().replace(tzinfo=get_localzone())
-        return mktdays_between(now, self.expr)
+    def remainingMarketDays(self, ctx=None):
+        return (ctx or runctx.active()).remainingMarketDays(self.expr)
 
 
     #---------------------------------------------------------------------------
@@ -0,0 +1,192 @@
+import numpy as np
+
+import parameters as p
+from option import MULT
+from functions import stockCDF, stockPartialMean, stockPartialSquare
+
+# Keys of the dict returned by metrics()
+METRICS = ('exp', 'pop', 'loss', 'cvar', 'var', 'ratio')
+
+
+#-------------------------------------------------------------------------------
+## Piecewise linear math
+# These work on the last axis and broadcast over any leading (batch) axes.
+# 'x' starts at 0 and holds the kink prices in increasing order, 'values' is the
+# exercise value at 'x' and 'slopeRight' the slope above the last kink.
+def pieces(x, values, slopeRight):
+    # Returns lower bound, upper bound, intercept and slope of every linear piece.
+    # The last piece runs from the highest kink to infinity.
+    lo = x
+    hi = np.concatenate((x[..., 1:], np.full(x.shape[:-1] + (1,), np.inf)), axis=-1)
+    dx = np.diff(x, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(dx > 0, np.diff(values, axis=-1)/dx, 0)
+    slope = np.concatenate((slope, np.asarray(slopeRight, dtype=float)[..., np.newaxis]), axis=-1)
+    icpt = values - slope*lo
+    return lo, hi, icpt, slope
+
+
+def positivePieces(lo, hi, icpt, slope, values):
+    # Returns start, end and a keep mask of the price intervals on which the value is >= 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.where(slope != 0, -icpt/slope, np.nan)
+
+    up = slope > 0
+    down = slope < 0
+    start = np.where(up & (values < 0), root, lo)
+    end = np.where(down, np.minimum(root, hi), hi)
+    flatBad = (slope == 0) & (values < 0)
+    downBad = down & (values < 0)
+    keep = ~flatBad & ~downBad & (start < end)
+    return start, end, keep
+
+
+def expectedOf(lo, icpt, slope, t, stock_price, wk_vol, wk_drift=0):
+    # Expected value of the pieces under stockPDF
+    edges = np.concatenate((lo, np.full(lo.shape[:-1] + (1,), np.inf)), axis=-1)
+    F = stockCDF(edges, t, stock_price, wk_vol, drift=wk_drift)
+    G = stockPartialMean(edges, t, stock_price, wk_vol, drift=wk_drift)
+    return np.sum(icpt*np.diff(F, axis=-1) + slope*np.diff(G, axis=-1), axis=-1)
+
+
+def probOf(start, end, keep, t, stock_price, wk_vol, wk_drift=0):
+    # Probability mass of the kept intervals under stockPDF
+    start = np.where(keep, start, 0)
+    end = np.where(keep, end, 0)
+    F = stockCDF(np.stack((start, end)), t, stock_price, wk_vol, drift=wk_drift)
+    return np.sum(F[1] - F[0], axis=-1)
+
+
+def metricsOf(lo, hi, icpt, slope, values, maxP, t, stock_price, wk_vol, wk_drift=0):
+    # Expected profit, probability of profit, expected loss, expected loss given a loss (CVaR),
+    # variance and expected/max profit ratio from one pass over the pieces.
+    # The ratio is nan when the max profit is unbounded.
+    # Every piece is split at its root, so each half has a single sign.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.where(slope != 0, -icpt/slope, np.nan)
+    mid = np.where((root > lo) & (root < hi), root, hi)
+    edges = np.stack((lo, mid, hi))
+    F = stockCDF(edges, t, stock_price, wk_vol, drift=wk_drift)
+    G = stockPartialMean(edges, t, stock_price, wk_vol, drift=wk_drift)
+    H = stockPartialSquare(edges, t, stock_price, wk_vol, drift=wk_drift)
+    M0, M1, M2 = np.diff(F, axis=0), np.diff(G, axis=0), np.diff(H, axis=0)
+
+    # [lo, mid] has the sign at 'lo', [mid, hi] the sign of the slope
+    neg = np.stack((
+        (values < 0) | ((values == 0) & (slope < 0)),
+        slope < 0))
+    with np.errstate(invalid='ignore'):
+        first = np.where(M0 > 0, icpt*M0 + slope*M1, 0)
+        second = np.where(M0 > 0, icpt**2*M0 + 2*icpt*slope*M1 + slope**2*M2, 0)
+
+    exp = np.sum(first, axis=(0, -1))
+    pop = np.sum(np.where(neg, 0, M0), axis=(0, -1))
+    lossProb = np.sum(np.where(neg, M0, 0), axis=(0, -1))
+    loss = -np.sum(np.where(neg, first, 0), axis=(0, -1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cvar = np.where(lossProb > 0, loss/lossProb, 0)
+        ratio = np.where(np.isinf(maxP), np.nan, exp/maxP)
+    var = np.sum(second, axis=(0, -1)) - exp**2
+    return dict(zip(METRICS, (exp, pop, loss, cvar, var, ratio)))
+
+
+def maxOf(values, slopeRight):
+    return np.where(slopeRight > 0, np.inf, np.max(values, axis=-1))
+
+
+def lossOf(values, slopeRight):
+    return np.where(slopeRight < 0, np.inf, -np.min(values, axis=-1))
+
+
+#-------------------------------------------------------------------------------
+class PayoffProfile:
+    # Exact exercise value of a set of option legs as a function of the stock price.
+    # The value is linear between the strikes, so it is stored as the values at
+    # 0 and at every strike plus the slope above the highest strike.
+    def __init__(self, strike, CP, BS, n, premium):
+        strike = np.asarray(strike, dtype=float)
+        CP = np.asarray(CP, dtype=float)
+        BS = np.asarray(BS, dtype=float)
+        n = np.asarray(n, dtype=float)
+        premium = np.asarray(premium, dtype=float)
+
+        self.cost = np.sum(n*(MULT*BS*premium + p.option_commission))
+        self.weight = n*MULT*BS
+        self.strike = strike
+        self.CP = CP
+
+        self.kinks = np.unique(strike)
+        self.x = np.concatenate(([0.], self.kinks))
+        self.values = self.value(self.x)
+        self.slopeRight = np.sum(self.weight*(CP == 1))
+
+
+    @classmethod
+    def fromOptions(cls, oplist):
+        strike = [op.strike for op in oplist]
+        CP = [op.CP for op in oplist]
+        BS = [op.BS for op in oplist]
+        n = [op.n for op in oplist]
+        premium = [op.premium for op in oplist]
+        return cls(strike, CP, BS, n, premium)
+
+
+    #---------------------------------------------------------------------------
+    ## Shape
+    def value(self, stock_price):
+        S = np.asarray(stock_price, dtype=float)[..., np.newaxis]
+        intrinsic = np.maximum(self.CP*(S - self.strike), 0)
+        return -self.cost + np.sum(self.weight*intrinsic, axis=-1)
+
+
+    def segments(self):
+        # Returns lower bound, upper bound, intercept and slope of every linear piece.
+        # The last piece runs from the highest strike to infinity.
+        return pieces(self.x, self.values, self.slopeRight)
+
+
+    def positive(self):
+        # Returns the price intervals (lo, hi) on which the exercise value is >= 0
+        start, end, keep = positivePieces(*self.segments(), self.values)
+        return start[keep], end[keep]
+
+
+    def breakevens(self):
+        lo, hi = self.positive()
+        edges = np.concatenate((lo, hi))
+        edges = edges[(edges > 0) & np.isfinite(edges)]
+        # Touching intervals share an edge that isn't a sign change
+        edges, counts = np.unique(edges, return_counts=True)
+        return edges[counts == 1]
+
+
+    def slopes(self):
+        # Slope of every linear piece, from 0 up to above the highest strike
+        return self.segments()[3]
+
+
+    def maxProfit(self):
+        # Largest exercise value over all prices, inf when the upper tail is unbounded
+        return maxOf(self.values, self.slopeRight)[()]
+
+
+    def maxLoss(self):
+        # Largest loss (as a positive amount) over all prices, inf when the upper tail is unbounded
+        return lossOf(self.values, self.slopeRight)[()]
+
+
+    #---------------------------------------------------------------------------
+    ## Lognormal expectations
+    def expectedProfit(self, t, stock_price, wk_vol, wk_drift=0):
+        lo, hi, icpt, slope = self.segments()
+        return expectedOf(lo, icpt, slope, t, stock_price, wk_vol, wk_drift=wk_drift)
+
+
+    def probOfProfit(self, t, stock_price, wk_vol, wk_drift=0):
+        start, end, keep = positivePieces(*self.segments(), self.values)
+        return probOf(start, end, keep, t, stock_price, wk_vol, wk_drift=wk_drift)
+
+
+    def metrics(self, t, stock_price, wk_vol, wk_drift=0):
+        m = metricsOf(*self.segments(), self.values, self.maxProfit(), t, stock_price, wk_vol, wk_drift=wk_drift)
+        return {k: v[()] for k, v in m.items()}
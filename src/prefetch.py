@@ -0,0 +1,45 @@
+import queue
+import threading
+
+import settings as s
+
+# End of the symbol list
+DONE = object()
+
+
+class Prefetcher(threading.Thread):
+    # Runs 'fetch(symbol)' for every symbol in a background thread, so network I/O for the next
+    # symbols overlaps the evaluation of the current one. At most 'depth' fetched symbols wait in
+    # the queue, which holds the fetcher back when evaluation is the slow stage.
+    # Iterating yields (symbol, result), where result is the exception if the fetch failed.
+    def __init__(self, fetch, symbols, depth=s.prefetch_depth):
+        super().__init__(daemon=True)
+        self.fetch = fetch
+        self.symbols = list(symbols)
+        self.queue = queue.Queue(maxsize=depth)
+
+
+    def __repr__(self):
+        return 'Prefetcher: {} symbols, {} ready'.format(len(self.symbols), self.queue.qsize())
+
+
+    def run(self):
+        try:
+            for symbol in self.symbols:
+                try:
+                    result = self.fetch(symbol)
+                except Exception as err:
+                    result = err
+                self.queue.put((symbol, result))
+        finally:
+            self.queue.put((DONE, None))
+
+
+    def __iter__(self):
+        if not self.is_alive() and self.ident is None:
+            self.start()
+        while True:
+            symbol, result = self.queue.get()
+            if symbol is DONE:
+                return
+            yield symbol, result
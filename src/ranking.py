@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import math
+import numpy as np
+
+# Streaming ranking of scan results.
+# An entry is (strat, pop, exp, metrics) as produced by evaluate.evalShared.
+
+
+#-------------------------------------------------------------------------------
+# Scores
+def scaledProfit(entry):
+    return entry[1]*entry[2]
+
+def maxProfit(entry):
+    # An unbounded max profit ranks by the expected profit instead, a finite lower bound on it
+    mp = entry[0].maxProfit()
+    return entry[2] if np.isinf(mp) else mp
+
+def expectedProfit(entry):
+    return entry[2]
+
+def profitPerRisk(entry):
+    # Expected profit per standard deviation of P&L, a riskless (or rounding-negative) variance counts as $1
+    return entry[3]['exp']/max(entry[3]['var'], 1)**0.5
+
+def profitPerTailLoss(entry):
+    # Expected profit per expected loss given a loss
+    return entry[3]['exp']/max(entry[3]['cvar'], 1)
+
+SCORES = {'scaledProfit': scaledProfit,
+          'maxProfit': maxProfit,
+          'expectedProfit': expectedProfit,
+          'profitPerRisk': profitPerRisk,
+          'profitPerTailLoss': profitPerTailLoss}
+
+
+#-------------------------------------------------------------------------------
+class TopK:
+    # The 'k' highest scoring entries seen so far, in a bounded min-heap
+    # A nan score ranks last
+    def __init__(self, k, score=maxProfit):
+        self.k = k
+        self.score = score
+        self.heap = []
+        self.count = itertools.count()  # Tie breaker, entries themselves aren't comparable
+
+
+    def __repr__(self):
+        return 'TopK: {} of {}'.format(len(self.heap), self.k)
+
+
+    def __len__(self):
+        return len(self.heap)
+
+
+    def push(self, entry):
+        sc = float(self.score(entry))
+        if math.isnan(sc):
+            sc = -math.inf
+        item = (sc, next(self.count), entry)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item[0] > self.heap[0][0]:
+            heapq.heapreplace(self.heap, item)
+
+
+    def extend(self, entries):
+        for entry in entries:
+            self.push(entry)
+
+
+    def sorted(self):
+        # Entries from the highest score down
+        return [entry for _, _, entry in sorted(self.heap, key=lambda it: (-it[0], it[1]))]
+
+
+#-------------------------------------------------------------------------------
+def objectives(entry):
+    # (expected profit, probability of profit, -max loss), all to be maximized
+    return (entry[2], entry[1], -entry[0].maxLoss())
+
+
+class ParetoFront:
+    # Entries no other entry beats on every objective
+    # Each push compares against the current front only, as one array expression
+    def __init__(self, objectives=objectives, nObj=3):
+        self.objectives = objectives
+        self.points = np.empty((0, nObj))
+        self.entries = []
+
+
+    def __repr__(self):
+        return 'ParetoFront: {} entries'.format(len(self.entries))
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def push(self, entry):
+        pt = np.asarray(self.objectives(entry), dtype=float)
+        if np.any(np.all(self.points >= pt, axis=1)):
+            # Dominated, or a duplicate of a point on the front
+            return False
+
+        keep = ~np.all(pt >= self.points, axis=1)
+        self.points = np.concatenate((self.points[keep], pt[np.newaxis, :]))
+        self.entries = [e for e, k in zip(self.entries, keep) if k] + [entry]
+        return True
+
+
+    def extend(self, entries):
+        for entry in entries:
+            self.push(entry)
+
+
+    def sorted(self, key=0):
+        # Front entries ordered by one objective, highest first
+        order = np.argsort(-self.points[:, key], kind='stable')
+        return [self.entries[i] for i in order]
@@ -0,0 +1,165 @@
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pytz
+
+from payoff import METRICS
+import settings as s
+
+# Columnar scan results.
+# A run is a directory <results_dir>/<run>/ holding meta.json (template and symbol names,
+# the ids used in the columns) and one partition directory per symbol with one .npy file per
+# column. Partitions are opened memory-mapped, so a column can be sliced without reading the
+# rest of the run.
+#
+# Columns, one row per strategy:
+#   symbol, template   int ids into meta['symbols'] / meta['templates']
+#   expiry             datetime64[s], UTC
+#   nLegs              legs of the row, the leg columns are padded with nan / 0 past it
+#   strike, premium, n (rows, legs) float
+#   BS, CP             (rows, legs) int8
+#   exp, pop, loss, cvar, var, ratio, maxProfit, maxLoss   float
+
+LEG_COLUMNS = ('strike', 'premium', 'BS', 'CP', 'n')
+METRIC_COLUMNS = METRICS + ('maxProfit', 'maxLoss')
+COLUMNS = ('symbol', 'template', 'expiry', 'nLegs') + LEG_COLUMNS + METRIC_COLUMNS
+
+
+def toDatetime64(when):
+    return np.datetime64(when.astimezone(pytz.utc).replace(tzinfo=None), 's')
+
+
+def entryColumns(entries, symbolId, templateId):
+    # Column arrays of scan entries (strat, pop, exp, metrics)
+    # 'symbolId' and 'templateId' map a symbol / template class to its id
+    nRows = len(entries)
+    width = max([len(st.oplist) for st, _, _, _ in entries], default=0)
+    cols = {'symbol': np.empty(nRows, dtype=np.int32),
+            'template': np.empty(nRows, dtype=np.int32),
+            'expiry': np.empty(nRows, dtype='datetime64[s]'),
+            'nLegs': np.empty(nRows, dtype=np.int8),
+            'strike': np.full((nRows, width), np.nan),
+            'premium': np.full((nRows, width), np.nan),
+            'n': np.zeros((nRows, width)),
+            'BS': np.zeros((nRows, width), dtype=np.int8),
+            'CP': np.zeros((nRows, width), dtype=np.int8)}
+    for name in METRIC_COLUMNS:
+        cols[name] = np.empty(nRows)
+
+    for i, (st, pop, exp, m) in enumerate(entries):
+        cols['symbol'][i] = symbolId(st.symbol)
+        cols['template'][i] = templateId(type(st))
+        cols['expiry'][i] = toDatetime64(st.expr)
+        legs = st.legs()
+        cols['nLegs'][i] = len(legs)
+        for j, name in enumerate(('strike', 'CP', 'BS', 'n', 'premium')):
+            cols[name][i, :len(legs)] = legs[:, j]
+        for name in METRICS:
+            cols[name][i] = m[name]
+        cols['maxProfit'][i] = st.maxProfit()
+        cols['maxLoss'][i] = st.maxLoss()
+
+    return cols
+
+
+#-------------------------------------------------------------------------------
+class ResultWriter:
+    # Writes the partitions of one run
+    def __init__(self, run, templates, directory=s.results_dir):
+        self.run = run
+        self.directory = os.path.join(directory, run)
+        self.templates = [cls.__name__ for cls in templates]
+        self.symbols = []
+        os.makedirs(self.directory, exist_ok=True)
+        self.writeMeta()
+
+
+    def __repr__(self):
+        return 'ResultWriter: {}, {} partitions'.format(self.directory, len(self.symbols))
+
+
+    def symbolId(self, symbol):
+        if symbol not in self.symbols:
+            self.symbols.append(symbol)
+        return self.symbols.index(symbol)
+
+
+    def templateId(self, cls):
+        return self.templates.index(cls.__name__)
+
+
+    def writeMeta(self):
+        meta = {'run': self.run, 'templates': self.templates, 'symbols': self.symbols, 'columns': COLUMNS}
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.directory, 'meta.json'))
+
+
+    def write(self, name, entries):
+        # Writes 'entries' as partition 'name' (a symbol, or e.g. 'top' for a ranking),
+        # replacing any earlier one. The columns go to a temporary directory that is then
+        # renamed into place, so readers never see half a partition.
+        cols = entryColumns(entries, self.symbolId, self.templateId)
+        tmp = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+        for col, arr in cols.items():
+            np.save(os.path.join(tmp, col + '.npy'), arr)
+
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+        self.writeMeta()
+        return path
+
+
+#-------------------------------------------------------------------------------
+class ResultSet:
+    # Read side of one run, nothing is loaded until a column is touched
+    def __init__(self, run, directory=s.results_dir):
+        self.directory = os.path.join(directory, run)
+        with open(os.path.join(self.directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+
+
+    def __repr__(self):
+        return 'ResultSet: {}, {} symbols'.format(self.directory, len(self.meta['symbols']))
+
+
+    def partitions(self):
+        return sorted(d for d in os.listdir(self.directory)
+                      if not d.startswith('.') and os.path.isdir(os.path.join(self.directory, d)))
+
+
+    def partition(self, name, columns=COLUMNS):
+        # {column: memory-mapped array} of one partition
+        path = os.path.join(self.directory, name)
+        return {col: np.load(os.path.join(path, col + '.npy'), mmap_mode='r') for col in columns}
+
+
+    def column(self, col, names=None):
+        # One column over several partitions (all symbols by default), concatenated
+        if names is None:
+            names = [n for n in self.partitions() if n in self.meta['symbols']]
+        parts = [self.partition(n, columns=(col,))[col] for n in names]
+        return np.concatenate(parts) if parts else np.empty(0)
+
+
+    def strategies(self, name, rows):
+        # Rebuilds the strategy objects of some rows of a partition
+        from option import parseExpiry
+        from stratlist import allstrats
+        classes = {cls.__name__: cls for cls in allstrats}
+        part = self.partition(name)
+        strats = []
+        for i in np.atleast_1d(rows):
+            cls = classes[self.meta['templates'][part['template'][i]]]
+            nl = part['nLegs'][i]
+            # Expiries are 17:30 New York time, the same day in UTC
+            expr = parseExpiry(str(part['expiry'][i].astype('datetime64[D]')))
+            n = int(round(part['n'][i, 0]/cls.spec().M[0]))
+            strats.append(cls.fromLegs(self.meta['symbols'][part['symbol'][i]], expr,
+                                       part['strike'][i, :nl].tolist(), part['premium'][i, :nl].tolist(), n=n))
+        return strats
@@ -0,0 +1,145 @@
+import datetime
+import json
+import math
+import sqlite3
+
+from payoff import METRICS
+import settings as s
+
+# Embedded SQLite store of scan survivors.
+# Every scan is a row of 'runs', and its strategies are rows of 'strategies' tagged with that
+# run, so several scans can be queried side by side. Filled one symbol at a time as the scan runs.
+
+METRIC_COLUMNS = METRICS + ('maxProfit', 'maxLoss')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY,
+    name     TEXT UNIQUE NOT NULL,
+    settings TEXT
+);
+CREATE TABLE IF NOT EXISTS strategies (
+    id        INTEGER PRIMARY KEY,
+    run       INTEGER NOT NULL REFERENCES runs(id),
+    symbol    TEXT NOT NULL,
+    template  TEXT NOT NULL,
+    expiry    TEXT NOT NULL,
+    legs      TEXT NOT NULL,
+    exp REAL, pop REAL, loss REAL, cvar REAL, var REAL, ratio REAL, maxProfit REAL, maxLoss REAL
+);
+-- Most queries don't filter on the run, only the per-run ranking index leads with it
+CREATE INDEX IF NOT EXISTS strat_template_pop ON strategies (template, pop, exp);
+CREATE INDEX IF NOT EXISTS strat_symbol_template ON strategies (symbol, template);
+CREATE INDEX IF NOT EXISTS strat_expiry_date ON strategies (expiry);
+CREATE INDEX IF NOT EXISTS strat_exp_value ON strategies (exp);
+CREATE INDEX IF NOT EXISTS strat_pop_value ON strategies (pop);
+CREATE INDEX IF NOT EXISTS strat_run_exp ON strategies (run, exp);
+'''
+
+# Columns query() may sort on
+ORDER_COLUMNS = ('symbol', 'template', 'expiry') + METRIC_COLUMNS
+
+
+def toReal(x):
+    # nan isn't storable, it becomes NULL
+    x = float(x)
+    return None if math.isnan(x) else x
+
+
+class ResultsDB:
+    def __init__(self, path=s.results_db):
+        self.path = path
+        self.con = sqlite3.connect(path)
+        self.con.row_factory = sqlite3.Row
+        self.con.execute('PRAGMA journal_mode=WAL')
+        self.con.executescript(SCHEMA)
+
+
+    def __repr__(self):
+        return 'ResultsDB: {}'.format(self.path)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def close(self):
+        self.con.close()
+
+
+    #---------------------------------------------------------------------------
+    ## Write
+    def startRun(self, name, settings=None):
+        # Returns the id of run 'name', creating it if needed
+        with self.con:
+            self.con.execute('INSERT OR IGNORE INTO runs (name, settings) VALUES (?, ?)',
+                             (name, json.dumps(settings or {})))
+        return self.con.execute('SELECT id FROM runs WHERE name = ?', (name,)).fetchone()['id']
+
+
+    def add(self, run, entries):
+        # Stores scan entries (strat, pop, exp, metrics) in one transaction
+        rows = []
+        for st, pop, exp, m in entries:
+            legs = [[op.strike, op.CP, op.BS, op.n, op.premium] for op in st.oplist]
+            rows.append((run, st.symbol, type(st).__name__, st.expr.isoformat(), json.dumps(legs))
+                        + tuple(toReal(m[k]) for k in METRICS)
+                        + (toReal(st.maxProfit()), toReal(st.maxLoss())))
+
+        with self.con:
+            self.con.executemany('INSERT INTO strategies (run, symbol, template, expiry, legs, {}) VALUES ({})'.format(
+                ', '.join(METRIC_COLUMNS), ', '.join('?'*(5 + len(METRIC_COLUMNS)))), rows)
+
+
+    #---------------------------------------------------------------------------
+    ## Query
+    def runs(self):
+        return self.con.execute('SELECT * FROM runs ORDER BY id').fetchall()
+
+
+    def query(self, runs=None, symbols=None, templates=None, expiry=None, minPop=None, minExp=None,
+              orderBy='exp', descending=True, limit=None):
+        # Strategies matching every given filter, with the run name, best first on 'orderBy'
+        #   runs, symbols, templates: lists of run names, symbols and template class names
+        #   expiry: (first, last) ISO dates or dates, inclusive
+        where, args = [], []
+        for col, values in (('runs.name', runs), ('symbol', symbols), ('template', templates)):
+            if values is not None:
+                where.append('{} IN ({})'.format(col, ', '.join('?'*len(values))))
+                args += list(values)
+        if expiry is not None:
+            # Stored as ISO timestamps, which sort by date first: from the first day up to the
+            # day after the last
+            first, last = (datetime.date.fromisoformat(str(d)) for d in expiry)
+            where.append('expiry >= ? AND expiry < ?')
+            args += [first.isoformat(), (last + datetime.timedelta(days=1)).isoformat()]
+        if minPop is not None:
+            where.append('pop > ?')
+            args.append(minPop)
+        if minExp is not None:
+            where.append('exp > ?')
+            args.append(minExp)
+
+        if orderBy not in ORDER_COLUMNS:
+            raise ValueError('Can\'t order by {}, use one of {}'.format(orderBy, ORDER_COLUMNS))
+
+        sql = 'SELECT runs.name AS runName, strategies.* FROM strategies JOIN runs ON runs.id = strategies.run'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY {} {}'.format(orderBy, 'DESC' if descending else 'ASC')
+        if limit is not None:
+            sql += ' LIMIT ?'
+            args.append(limit)
+        return self.con.execute(sql, args).fetchall()
+
+
+    def compare(self, runs, **filters):
+        # query() over several runs, grouped as {run name: rows}
+        out = {name: [] for name in runs}
+        for row in self.query(runs=runs, **filters):
+            out[row['runName']].append(row)
+        return out
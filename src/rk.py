@@ -46,4 +46,126 @@ def rk(bTab, func, tSpan, dt, y0):
         y[i+1,:] = y[i,:] + h*sum_bk
         
     
-    return t, y
\ No newline at end of file
+    return t, y
+
+def rkQuad(bTab, func, tSpan, dt, y0):
+    # Quadrature form of rk() for integrands that ignore the state, i.e. y' = f(t).
+    # Every stage node of every step is built up front and 'func' is called once
+    # on the whole node array. 'func(t, None)' must accept an array of times and
+    # return an array of shape (dim, len(t)) (or (len(t),) when dim == 1).
+    # 'tSpan' may also be an (intervals, 2) array of spans, each cut into steps of about
+    # 'dt' (at least one), which are integrated one after the other in the same call.
+    ## Preliminary
+    rows, cols = bTab.shape
+    try:
+        dim = max(y0.shape)
+    except:
+        dim = 1
+
+    stages = cols - 1
+
+    b = bTab[cols-1, 1:cols]
+    c = bTab[0:stages, 0]
+
+    # Stages with zero weight never contribute when the state is ignored
+    used = b != 0
+    b = b[used]
+    c = c[used]
+
+
+    ## Setup
+    spans = np.atleast_2d(tSpan)
+    tLen = spans[:,1] - spans[:,0]
+    perSpan = np.maximum(np.round(tLen/dt).astype(int), 1)
+    steps = perSpan.sum()
+    h = np.repeat(tLen/perSpan, perSpan)
+
+    # Step i of a span starts at t0 + i*h
+    first = np.cumsum(perSpan) - perSpan
+    ts = np.repeat(spans[:,0], perSpan) + h*(np.arange(steps) - np.repeat(first, perSpan))
+    t = np.append(ts, spans[-1,1])
+    nodes = ts[:, np.newaxis] + h[:, np.newaxis]*c[np.newaxis, :]
+
+
+    ## Integrate
+    k = np.reshape(func(nodes.ravel(), None), (dim, steps, len(b)))
+    dy = h*np.dot(k, b)
+
+    y = np.zeros((steps+1, dim))
+    y[0,:] = y0
+    y[1:,:] = y[0,:] + np.cumsum(dy.T, axis=0)
+
+    return t, y
+
+
+# Adaptive step control
+SAFETY = 0.9
+FAC_MIN = 0.2
+FAC_MAX = 5.0
+
+def rkAdapt(bTab, func, tSpan, dt, y0, rtol=1e-6, atol=1e-9, quad=False, order=5):
+    # Error-controlled rk() for embedded tableaus. The row after the 'b' row of 'bTab' holds
+    # the lower order weights used for the error estimate. 'dt' is only the initial step and
+    # 'order' is the order of the 'b' row. 'tSpan' may run backwards.
+    # With 'quad=True', 'func' ignores the state and is called once per step on all stage nodes.
+    # Returns t, y and a dict with the accepted and rejected step counts.
+    ## Preliminary
+    rows, cols = bTab.shape
+    try:
+        dim = max(y0.shape)
+    except:
+        dim = 1
+
+    stages = cols - 1
+
+    a = bTab[0:stages, 1:cols]
+    b = bTab[cols-1, 1:cols]
+    e = b - bTab[cols, 1:cols]
+    c = bTab[0:stages, 0]
+
+
+    ## Setup
+    t0 = tSpan[0]
+    tf = tSpan[1]
+    direction = np.sign(tf - t0)
+    hMin = 1e-12*abs(tf - t0)
+    h = min(abs(dt), abs(tf - t0))
+
+    t = [t0]
+    y = [np.zeros(dim) + y0]
+    stats = {'steps': 0, 'rejected': 0}
+
+
+    ## Integrate
+    while direction*(tf - t[-1]) > hMin:
+        h = min(h, direction*(tf - t[-1]))
+        hs = direction*h
+        ti = t[-1]
+        yi = y[-1]
+        if quad:
+            k = np.reshape(func(ti + c*hs, None), (dim, stages)).T
+        else:
+            k = np.zeros((stages, dim))
+            for s in range(stages):
+                ys = yi + hs*np.dot(a[s,0:s], k[0:s,:])
+                k[s,:] = func(ti + c[s]*hs, ys)
+
+        yNew = yi + hs*np.dot(b, k)
+        err = h*np.dot(e, k)
+        scale = atol + rtol*np.maximum(np.abs(yi), np.abs(yNew))
+        errNorm = np.sqrt(np.mean((err/scale)**2))
+
+        if errNorm <= 1 or h <= hMin:
+            t.append(ti + hs)
+            y.append(yNew)
+            stats['steps'] += 1
+        else:
+            stats['rejected'] += 1
+
+        if errNorm == 0:
+            h *= FAC_MAX
+        else:
+            h *= min(FAC_MAX, max(FAC_MIN, SAFETY*errNorm**(-1/order)))
+
+
+    return np.array(t), np.array(y), stats
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from tzlocal import get_localzone
+
+from mktcalendar import tradingDaysBetween
+
+# Run-wide clock
+# A RunContext freezes "now" once so that every strategy in a scan sees the same
+# time to expiry, and caches that time per expiry date.
+
+
+class RunContext:
+    def __init__(self, now=None):
+        if now is None:
+            now = datetime.now(get_localzone())
+        self.now = now
+        self.mktdays = {}
+
+
+    def __repr__(self):
+        return 'RunContext: now = {}, {} expiries'.format(self.now, len(self.mktdays))
+
+
+    #---------------------------------------------------------------------------
+    ## Time to expiry
+    def remainingTime(self, expr):
+        return expr - self.now
+
+
+    def remainingDays(self, expr):
+        return self.remainingTime(expr).total_seconds()/timedelta(days=1).total_seconds()
+
+
+    def remainingMarketDays(self, expr):
+        try:
+            return self.mktdays[expr]
+        except KeyError:
+            days = tradingDaysBetween(self.now, expr)
+            self.mktdays[expr] = days
+            return days
+
+
+    def prime(self, exprs):
+        # Fill the time to expiry table before shipping the context to workers
+        for expr in exprs:
+            self.remainingMarketDays(expr)
+        return self
+
+
+#-------------------------------------------------------------------------------
+## Active context
+_active = None
+
+def freeze(now=None):
+    # Freeze the clock for the rest of the run
+    global _active
+    _active = RunContext(now=now)
+    return _active
+
+
+def release():
+    global _active
+    _active = None
+
+
+def active():
+    # The frozen context if there is one, otherwise a live one
+    if _active is None:
+        return RunContext()
+    return _active
@@ -1,6 +1,24 @@
 min_prob_profit = 0.85
 max_prob_exercise = 0.5
-opchain_size = 12
+opchain_size = 12  # Strikes fetched per expiry, strike_window may narrow them further
 nContracts = 1
 min_profit_ratio = 0.45
 min_expected_profit = 100
+int_rtol_screen = None  # None screens with the fixed-step quadrature, adaptive steps cost more at any rtol
+int_rtol_final = 1e-6
+int_atol = 1e-6
+analytic_eval = True
+gen_chunk = 2000
+moneyness_window = None  # (lo, hi) fraction of the stock price every strike must lie in
+max_spread_width = None
+min_credit = None
+strike_window = 2.0  # Standard deviations of log price at expiry, None for the whole chain
+task_seconds = 0.05  # Smallest worth-while pool task
+rank_k = 1000
+rank_score = 'maxProfit'  # Key of ranking.SCORES
+pareto_front = True  # Also keep the (expected profit, PoP, max loss) Pareto front
+prefetch_depth = 2  # Symbols fetched ahead of the evaluation
+checkpoint_dir = 'checkpoints'
+resume = True  # Reuse the checkpoints of symbols done by an earlier run with the same inputs
+results_dir = 'results'
+results_db = 'results.sqlite'
@@ -0,0 +1,83 @@
+import numpy as np
+from functools import lru_cache
+from itertools import combinations, chain, islice
+from math import comb
+
+# Compiled strategy templates
+# A template 'structure' names strike slots 'A', 'B', ... in increasing strike order.
+# Each slot holds one or more legs {'BS': buy/sell, 'CP': call/put, 'M': contracts per unit},
+# and 'n' is the number of distinct strikes. For example an iron butterfly is
+#     {'A': [{'BS': p.BUY, 'CP': p.PUT, 'M': 1}],
+#      'B': [{'BS': p.SELL, 'CP': p.PUT, 'M': 1}, {'BS': p.SELL, 'CP': p.CALL, 'M': 1}],
+#      'C': [{'BS': p.BUY, 'CP': p.CALL, 'M': 1}],
+#      'n': 3}
+
+
+class StratSpec:
+    # Per-leg arrays compiled once from a structure dict
+    def __init__(self, structure):
+        self.keys = [I for I in structure if I != 'n']
+        self.nStrikes = structure['n']
+        if self.nStrikes != len(self.keys):
+            raise ValueError('Structure has {} strike slots but n = {}'.format(len(self.keys), self.nStrikes))
+
+        slot, pos, BS, CP, M = [], [], [], [], []
+        for k, I in enumerate(self.keys):
+            for j, J in enumerate(structure[I]):
+                slot.append(k)
+                pos.append(j)
+                BS.append(J['BS'])
+                CP.append(J['CP'])
+                M.append(J['M'])
+
+        self.slot = np.array(slot)  # Strike slot of every leg
+        self.pos = np.array(pos)  # Position of every leg within its slot
+        self.BS = np.array(BS)
+        self.CP = np.array(CP)
+        self.M = np.array(M)
+        self.nLegs = len(slot)
+
+
+    def __repr__(self):
+        return 'StratSpec: {} strikes, {} legs'.format(self.nStrikes, self.nLegs)
+
+
+    def slotAvailable(self, callOk, putOk):
+        # (nStrikes, strikes) mask, true where every leg of a slot has a contract at that strike
+        avail = np.ones((self.nStrikes, len(callOk)), dtype=bool)
+        for k, CP in zip(self.slot, self.CP):
+            avail[k] &= callOk if CP == 1 else putOk
+        return avail
+
+
+    def legIndex(self, combs):
+        # Maps (combinations, nStrikes) strike indices to (combinations, nLegs) leg strike indices
+        return np.asarray(combs)[..., self.slot]
+
+
+# Largest combination table kept in memory, bigger ones are streamed
+COMB_TABLE_MAX = 500000
+
+
+@lru_cache(maxsize=None)
+def combTable(nItems, k):
+    # All k-combinations of range(nItems) in lexicographic order, shared (read only) by every template
+    table = np.fromiter(chain.from_iterable(combinations(range(nItems), k)), dtype=int).reshape(-1, k)
+    table.flags.writeable = False
+    return table
+
+
+def combBlocks(nItems, k, chunk):
+    # Yields the k-combinations of range(nItems), in lexicographic order, as (<= chunk, k) index arrays
+    if comb(nItems, k) <= COMB_TABLE_MAX:
+        table = combTable(nItems, k)
+        for i in range(0, len(table), chunk):
+            yield table[i:i + chunk]
+        return
+
+    it = combinations(range(nItems), k)
+    while True:
+        block = np.fromiter(chain.from_iterable(islice(it, chunk)), dtype=int)
+        if len(block) == 0:
+            return
+        yield block.reshape(-1, k)
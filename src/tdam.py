@@ -16,7 +16,7 @@ import time
 import config
 import td_urls as urls
 import parameters as param
-from option import Option
+from opchain import OptionChain
 from api import API
 
 
@@ -151,25 +151,7 @@ class TDAM(API):
                   'fromDate': (enddate).strftime('%Y-%m-%d'),
                   'toDate': (enddate).strftime('%Y-%m-%d')}
         rq = requests.get(urls.OPTIONCHAIN, headers=self.headers(), params=PARAMS)
-        calls = {}
-        callDic = rq.json()['callExpDateMap']
-        for d in callDic:
-            calls[d] = {}
-            for p in callDic[d]:
-                opDic = callDic[d][p][0]
-                calls[d][p] = Option.fromParams(symbol, param.CALL, opDic['mark'], 0, float(p), d, ask=float(opDic['ask']), bid=float(opDic['bid']))
-                # calls[d][p] = Option.fromParams(symbol, param.CALL, (opDic['bid']+opDic['ask'])/2, 0, float(p), d, ask=float(opDic['ask']), bid=float(opDic['bid']))
-
-        puts = {}
-        putDic = rq.json()['putExpDateMap']
-        for d in putDic:
-            puts[d] = {}
-            for p in putDic[d]:
-                opDic = putDic[d][p][0]
-                puts[d][p] = Option.fromParams(symbol, param.PUT, opDic['mark'], 0, float(p), d, ask=float(opDic['ask']), bid=float(opDic['bid']))
-                # puts[d][p] = Option.fromParams(symbol, param.PUT, (opDic['bid']+opDic['ask'])/2, 0, float(p), d, ask=float(opDic['ask']), bid=float(opDic['bid']))
-
-        return {'calls': calls, 'puts': puts}
+        return OptionChain.fromTD(symbol, rq.json())
 
 
     def history_DF(self, symbol, ptype='day', period=10, ftype='minute', freq=15, extend='false'):
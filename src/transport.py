@@ -0,0 +1,47 @@
+import os
+import tempfile
+import uuid
+import numpy as np
+
+# Arrays handed to the process pool go through memory-mapped files instead of being
+# pickled with every task. Workers only receive 'desc', a small {name: path} dict.
+
+# RAM backed where the OS has one
+SHM_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+class SharedArrays:
+    # Named arrays written once, opened read-only (and without copying) by the workers
+    def __init__(self, arrays, prefix='stonx'):
+        self.desc = {}
+        for key, arr in arrays.items():
+            path = os.path.join(SHM_DIR, '{}-{}-{}.npy'.format(prefix, os.getpid(), uuid.uuid4().hex))
+            np.save(path, np.ascontiguousarray(arr))
+            self.desc[key] = path
+
+
+    def __repr__(self):
+        return 'SharedArrays: {}'.format(list(self.desc))
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def close(self):
+        for path in self.desc.values():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.desc = {}
+
+
+def attach(desc):
+    # Worker side: read-only views of the arrays in 'desc'
+    return {key: np.load(path, mmap_mode='r') for key, path in desc.items()}
+
@@ -0,0 +1,66 @@
+import math
+import multiprocessing as mp
+import time
+
+from functions import getThreads
+import settings as s
+
+
+def warm():
+    # Runs once in every worker: loads the numeric modules and compiles every template spec,
+    # so no task pays for it
+    import evaluate
+    from stratlist import allstrats
+    for cls in allstrats:
+        cls.spec()
+
+
+class WorkerPool:
+    # Process pool that lives for the whole scan.
+    # Sized from the CPUs this process may use, and splits every chunk of rows into tasks
+    # sized from the measured cost per row, so small templates aren't dominated by task overhead.
+    def __init__(self, nodes=None, taskSeconds=s.task_seconds):
+        self.nodes = nodes or getThreads()
+        self.taskSeconds = taskSeconds
+        self.rowCost = None  # Seconds of worker time per row, running average
+        self.pool = mp.get_context().Pool(self.nodes, initializer=warm)
+
+
+    def __repr__(self):
+        return 'WorkerPool: {} nodes, {} s/row'.format(self.nodes, self.rowCost)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+    def ranges(self, nRows):
+        # (lo, hi) row ranges, one per task
+        # Spread over every node, but never so thin that a task takes less than taskSeconds
+        size = math.ceil(nRows/self.nodes)
+        if self.rowCost:
+            size = max(size, math.ceil(self.taskSeconds/self.rowCost))
+        size = max(min(size, nRows), 1)
+        return [(lo, min(lo + size, nRows)) for lo in range(0, nRows, size)]
+
+
+    def mapRows(self, func, nRows, task):
+        # Maps 'func' over the tasks task(lo, hi) covering 'nRows' rows and concatenates the results
+        if nRows == 0:
+            return []
+
+        tasks = [task(lo, hi) for lo, hi in self.ranges(nRows)]
+        t0 = time.perf_counter()
+        parts = self.pool.map(func, tasks)
+        cost = (time.perf_counter() - t0)*min(len(tasks), self.nodes)/nRows
+        self.rowCost = cost if self.rowCost is None else (self.rowCost + cost)/2
+        return [r for part in parts for r in part]
@@ -0,0 +1,40 @@
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import settings as s
+from ranking import TopK, SCORES
+
+
+class Strat:
+    # Stands in for an OpStrat, ranking only needs its max profit and max loss
+    def __init__(self, name, maxProfit, maxLoss=-100.):
+        self.name = name
+        self.mp = maxProfit
+        self.ml = maxLoss
+
+    def maxProfit(self):
+        return self.mp
+
+    def maxLoss(self):
+        return self.ml
+
+
+def entry(name, maxProfit, exp, pop=0.8):
+    return (Strat(name, maxProfit), pop, exp, {'exp': exp, 'var': 100., 'cvar': 50.})
+
+
+def test_unbounded_max_profit_is_kept_under_default_score():
+    top = TopK(3, SCORES[s.rank_score])
+    top.extend([entry('bounded high', 300., 20.), entry('unbounded', math.inf, 150.),
+                entry('bounded low', 100., 40.)])
+    # Ranked by its expected profit, between the two bounded ones
+    assert [e[0].name for e in top.sorted()] == ['bounded high', 'unbounded', 'bounded low']
+
+
+def test_unbounded_max_profit_competes_for_a_full_heap():
+    top = TopK(1, SCORES[s.rank_score])
+    top.extend([entry('bounded', 100., 40.), entry('unbounded', math.inf, 150.)])
+    assert [e[0].name for e in top.sorted()] == ['unbounded']